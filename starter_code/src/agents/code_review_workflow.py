@@ -3,7 +3,7 @@ import logging
 import time
 import uuid
 from dataclasses import dataclass
-from typing import Any, Awaitable, Callable, Dict, Optional, Set, List
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, List, Tuple
 from langgraph.graph import StateGraph, END
 
 from .state import ReviewState
@@ -22,8 +22,7 @@ from ..utility.retry_utils import (RetryPolicy,
                                 validate_coordinator_update,
                                 run_node_with_retry,
                                 retry_predicate,
-                                retry_policy_for,
-                                retry_lists_for
+                                retry_settings_for
                                 )
 
 
@@ -50,6 +49,17 @@ class CodeReviewWorkflow:
 
         # pull retry config (recommended structure)
         self.retry_cfg = getattr(config, "retry", {}) or {}
+        # Resolved once per node; the config does not change under a workflow
+        self._coordinator_retry = self._retry_settings(self.coordinator.agent_id, RetryPolicy(max_attempts=3))
+        self._security_retry = self._retry_settings(self.security_agent.agent_id, RetryPolicy(max_attempts=2))
+        self._bug_retry = self._retry_settings(self.bug_agent.agent_id, RetryPolicy(max_attempts=2))
+
+    def _retry_settings(
+        self, agent_id: str, default: RetryPolicy
+    ) -> Tuple[RetryPolicy, Callable[[Exception], bool]]:
+        """Retry policy and retryability predicate for one node."""
+        policy, allow, deny = retry_settings_for(self.retry_cfg, agent_id, default)
+        return policy, lambda e: retry_predicate(e, allow, deny)
 
 
     def _build_graph(self) -> StateGraph:
@@ -174,8 +184,7 @@ class CodeReviewWorkflow:
         Coordinator retries are important because if planning fails, nothing runs.
         Also: coordinator MUST NOT touch specialist flags.
         """
-        policy = retry_policy_for(self.retry_cfg, self.coordinator.agent_id, RetryPolicy(max_attempts=3))
-        allow, deny = retry_lists_for(self.retry_cfg, self.coordinator.agent_id)
+        policy, is_retryable = self._coordinator_retry
 
         return await run_node_with_retry(
             event_bus=self.event_bus,
@@ -186,7 +195,7 @@ class CodeReviewWorkflow:
             validate_update=validate_coordinator_update,
             # Critical: prevent concurrent update collisions
             strip_keys={"bug_agent_completed", "security_agent_completed"},
-            is_retryable=lambda e: retry_predicate(e, allow, deny),
+            is_retryable=is_retryable,
             failure_patch={
                 "phase": "done",
                 "final_report": {"status": "failed", "error": "Coordinator failed"},
@@ -194,8 +203,7 @@ class CodeReviewWorkflow:
         )
 
     async def _security_node(self, state: ReviewState) -> Dict[str, Any]:
-        policy = retry_policy_for(self.retry_cfg, self.security_agent.agent_id, RetryPolicy(max_attempts=2))
-        allow, deny = retry_lists_for(self.retry_cfg, self.security_agent.agent_id)
+        policy, is_retryable = self._security_retry
 
         # Emit plan_step_started
         plan = state.get("plan", {})
@@ -221,7 +229,7 @@ class CodeReviewWorkflow:
             },
             # Security must never touch bug flag (this was your concurrency root cause)
             strip_keys={"bug_agent_completed"},
-            is_retryable=lambda e: retry_predicate(e, allow, deny),
+            is_retryable=is_retryable,
         )
         
         # Emit plan_step_completed
@@ -240,8 +248,7 @@ class CodeReviewWorkflow:
         return None
 
     async def _bug_node(self, state: ReviewState) -> Dict[str, Any]:
-        policy = retry_policy_for(self.retry_cfg, self.bug_agent.agent_id, RetryPolicy(max_attempts=2))
-        allow, deny = retry_lists_for(self.retry_cfg, self.bug_agent.agent_id)
+        policy, is_retryable = self._bug_retry
 
         # Emit plan_step_started
         plan = state.get("plan", {})
@@ -265,7 +272,7 @@ class CodeReviewWorkflow:
                 "bug_fixes": [],
             },
             strip_keys={"security_agent_completed"},
-            is_retryable=lambda e: retry_predicate(e, allow, deny),
+            is_retryable=is_retryable,
         )
         
         # Emit plan_step_completed
@@ -95,6 +95,10 @@ class Config:
     # Server Configuration
     server_host: str = "0.0.0.0"
     server_port: int = 8080
+    # Origins allowed to call the API from a browser; "*" allows any
+    allowed_origins: List[str] = field(default_factory=lambda: [
+        origin.strip() for origin in os.getenv("CORS_ALLOWED_ORIGINS", "*").split(",") if origin.strip()
+    ])
     
     # File Configuration
     supported_extensions: List[str] = field(default_factory=lambda: [".py"])
@@ -103,6 +107,8 @@ class Config:
     # Analysis Configuration
     parallel_agents: bool = True
     max_concurrent_agents: int = 3
+    max_concurrent_reviews: int = 2  # reviews running at once per server process
+    max_pending_reviews: int = 16  # reviews running or waiting for a slot per server process
 
     retry = RETRY
     
@@ -4,9 +4,10 @@ Supports both sync and async operations, WebSocket broadcasting.
 """
 
 import asyncio
-import json
 import logging
-from typing import Callable, Dict, List, Optional, Set, Any
+from collections import deque
+from itertools import islice
+from typing import Callable, Deque, Dict, List, Optional, Set, Tuple, Any
 from dataclasses import dataclass, field
 from datetime import datetime
 
@@ -33,15 +34,17 @@ class EventBus:
     - Support for filtering by event type and agent
     - WebSocket broadcast support
     - Event history for late subscribers
+    - Shared ring buffer that stream readers consume by sequence cursor
     """
     
-    def __init__(self, maxsize: int = 10000, history_size: int = 1000):
+    def __init__(self, maxsize: int = 10000, history_size: int = 1000, ring_size: int = 1024):
         """
         Initialize the event bus.
         
         Args:
             maxsize: Maximum size of the event queue
             history_size: Number of events to keep in history
+            ring_size: Number of recent events kept for stream readers
         """
         self._subscribers: List[Subscriber] = []
         self._event_queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
@@ -51,6 +54,13 @@ class EventBus:
         self._running = True
         self._lock = asyncio.Lock()
         
+        # One shared buffer for all stream readers (SSE); each reader keeps
+        # its own cursor instead of owning a queue the bus has to fill, and
+        # parks on its own asyncio.Event until something newer arrives.
+        self._ring: Deque[Tuple[int, Event]] = deque(maxlen=ring_size)
+        self._seq = 0
+        self._stream_waiters: Set[asyncio.Event] = set()
+        
         # Sync event loop for non-async contexts
         self._sync_loop: Optional[asyncio.AbstractEventLoop] = None
         
@@ -101,6 +111,9 @@ class EventBus:
         if len(self._history) > self._history_size:
             self._history = self._history[-self._history_size:]
         
+        # Append to the shared ring and wake stream readers
+        self._append_ring(event)
+        
         # Add to queue for streaming
         try:
             self._event_queue.put_nowait(event)
@@ -123,7 +136,53 @@ class EventBus:
                     logger.error(f"Error in subscriber callback: {e}")
         
         # Broadcast to WebSockets
-        await self._broadcast_to_websockets(event)
+        if self._websockets:
+            await self._broadcast_to_websockets(event)
+    
+    async def publish_many(self, events: List[Event]) -> None:
+        """
+        Publish several events in one pass.
+        
+        History and the ring are updated once for the whole batch and
+        stream readers are woken once; subscribers still see every event
+        in order.
+        
+        Args:
+            events: The events to publish, in order
+        """
+        if not events:
+            return
+        
+        self._history.extend(events)
+        if len(self._history) > self._history_size:
+            self._history = self._history[-self._history_size:]
+        
+        for event in events:
+            self._seq += 1
+            self._ring.append((self._seq, event))
+            try:
+                self._event_queue.put_nowait(event)
+            except asyncio.QueueFull:
+                logger.warning("Event queue full, dropping oldest event")
+                try:
+                    self._event_queue.get_nowait()
+                    self._event_queue.put_nowait(event)
+                except:
+                    pass
+        self.wake_streams()
+        
+        subscribers = self._subscribers
+        for event in events:
+            for subscriber in subscribers:
+                if self._should_notify(subscriber, event):
+                    try:
+                        result = subscriber.callback(event)
+                        if asyncio.iscoroutine(result):
+                            await result
+                    except Exception as e:
+                        logger.error(f"Error in subscriber callback: {e}")
+            if self._websockets:
+                await self._broadcast_to_websockets(event)
     
     def publish_sync(self, event: Event) -> None:
         """
@@ -137,6 +196,9 @@ class EventBus:
         if len(self._history) > self._history_size:
             self._history = self._history[-self._history_size:]
         
+        # Append to the shared ring and wake stream readers
+        self._append_ring(event)
+        
         # Try to add to queue
         try:
             self._event_queue.put_nowait(event)
@@ -152,7 +214,10 @@ class EventBus:
                 except Exception as e:
                     logger.error(f"Error in subscriber callback: {e}")
         
-        # Schedule WebSocket broadcast
+        # Schedule WebSocket broadcast; stream readers use the ring, so
+        # there is usually nobody registered and no task is needed
+        if not self._websockets:
+            return
         try:
             loop = asyncio.get_running_loop()
             asyncio.create_task(self._broadcast_to_websockets(event))
@@ -207,6 +272,103 @@ class EventBus:
             except asyncio.CancelledError:
                 break
     
+    def _append_ring(self, event: Event) -> None:
+        """Store the event in the ring and wake every parked stream reader."""
+        self._seq += 1
+        self._ring.append((self._seq, event))
+        self.wake_streams()
+    
+    def wake_streams(self) -> None:
+        """Wake every parked stream reader (new events, heartbeats)."""
+        for waiter in self._stream_waiters:
+            waiter.set()
+    
+    def open_stream(self) -> asyncio.Event:
+        """
+        Register a stream reader.
+        
+        Returns:
+            The reader's wake-up flag; pass it to wait_events and
+            close_stream
+        """
+        waiter = asyncio.Event()
+        self._stream_waiters.add(waiter)
+        return waiter
+    
+    def close_stream(self, waiter: asyncio.Event) -> None:
+        """Unregister a stream reader."""
+        self._stream_waiters.discard(waiter)
+    
+    @property
+    def last_seq(self) -> int:
+        """Sequence number of the most recently published event."""
+        return self._seq
+    
+    def events_since(self, cursor: int) -> List[Tuple[int, Event]]:
+        """
+        Get buffered events newer than a cursor.
+        
+        Args:
+            cursor: Sequence number of the last event the reader has seen
+            
+        Returns:
+            List of (seq, event) pairs, oldest first
+        """
+        pending = self._seq - cursor
+        if pending <= 0:
+            return []
+        start = max(len(self._ring) - pending, 0)
+        return list(islice(self._ring, start, None))
+    
+    def missed_since(self, cursor: int) -> int:
+        """
+        Count events a reader can no longer get because the ring overwrote them.
+        
+        Args:
+            cursor: Sequence number of the last event the reader has seen
+            
+        Returns:
+            Number of events published after cursor but already evicted
+        """
+        return max(self._seq - cursor - len(self._ring), 0)
+    
+    async def wait_events(
+        self,
+        cursor: int,
+        timeout: Optional[float] = None,
+        waiter: Optional[asyncio.Event] = None
+    ) -> List[Tuple[int, Event]]:
+        """
+        Wait until events newer than cursor are published.
+        
+        Args:
+            cursor: Sequence number of the last event the reader has seen
+            timeout: Optional timeout in seconds
+            waiter: Flag from open_stream; a temporary one is used if omitted
+            
+        Returns:
+            List of (seq, event) pairs; empty on timeout or if the waiter
+            was set without new events
+        """
+        # An empty ring with a newer seq means clear_history ran; wait for
+        # the next event instead of returning nothing straight away.
+        if self._seq <= cursor or not self._ring:
+            temporary = waiter is None
+            if temporary:
+                waiter = self.open_stream()
+            waiter.clear()
+            try:
+                if timeout is None:
+                    await waiter.wait()
+                else:
+                    await asyncio.wait_for(waiter.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                return []
+            finally:
+                if temporary:
+                    self.close_stream(waiter)
+        return self.events_since(cursor)
+    
     def register_websocket(self, websocket: Any) -> None:
         """Register a WebSocket connection for broadcasts."""
         self._websockets.add(websocket)
@@ -220,12 +382,13 @@ class EventBus:
         if not self._websockets:
             return
             
-        message = event.to_json()
+        # Serialize once; every socket gets the same bytes
+        message = event.to_bytes()
         disconnected = set()
         
         for ws in self._websockets:
             try:
-                await ws.send_text(message)
+                await ws.send_bytes(message)
             except Exception as e:
                 logger.debug(f"WebSocket send failed: {e}")
                 disconnected.add(ws)
@@ -272,6 +435,7 @@ class EventBus:
     def clear_history(self) -> None:
         """Clear the event history."""
         self._history = []
+        self._ring.clear()
     
     def stop(self) -> None:
         """Stop the event bus."""
@@ -282,6 +446,11 @@ class EventBus:
         """Get current queue size."""
         return self._event_queue.qsize()
     
+    @property
+    def stream_count(self) -> int:
+        """Get number of registered stream readers."""
+        return len(self._stream_waiters)
+    
     @property
     def websocket_count(self) -> int:
         """Get number of connected WebSockets."""
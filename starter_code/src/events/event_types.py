@@ -3,12 +3,69 @@ Event type definitions for the multi-agent system.
 Implements the schema defined in STREAMING_EVENTS_SPEC.md
 """
 
+import asyncio
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import uuid
-import json
+
+import orjson
+
+
+# Server-Sent Events framing shared by Event.to_sse and the SSE endpoint
+SSE_PREFIX = b"data: "
+SSE_SUFFIX = b"\n\n"
+
+# Tool outputs larger than this are streamed as a truncated preview; the
+# live view never needs the full text and the agents keep their own copy.
+TOOL_OUTPUT_PREVIEW_CHARS = 16 * 1024
+
+# Event timestamps are shared by every event created in the same event-loop
+# iteration; the cache is cleared by a call_soon callback on the next tick.
+_tick_now: Optional[datetime] = None
+_tick_iso = ""
+
+
+def _reset_tick() -> None:
+    global _tick_now
+    _tick_now = None
+
+
+def _utcnow() -> datetime:
+    """datetime.utcnow(), computed at most once per event-loop iteration."""
+    global _tick_now, _tick_iso
+    if _tick_now is None:
+        now = datetime.utcnow()
+        try:
+            asyncio.get_running_loop().call_soon(_reset_tick)
+        except RuntimeError:
+            return now  # no loop in this thread: nothing to reset the cache
+        _tick_now = now
+        _tick_iso = now.isoformat() + "Z"
+    return _tick_now
+
+
+def _format_timestamp(timestamp: datetime) -> str:
+    if timestamp is _tick_now:
+        return _tick_iso
+    return timestamp.isoformat() + "Z"
+
+
+def _output_preview(output: Any) -> Tuple[Any, bool]:
+    """Return (output or its truncated text, whether it was truncated)."""
+    if isinstance(output, str):
+        text = output
+    elif isinstance(output, (dict, list)):
+        try:
+            text = orjson.dumps(output, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+        except TypeError:
+            return output, False
+    else:
+        return output, False
+    if len(text) <= TOOL_OUTPUT_PREVIEW_CHARS:
+        return output, False
+    return f"{text[:TOOL_OUTPUT_PREVIEW_CHARS]}…(truncated, {len(text)} chars)", True
 
 
 class EventType(Enum):
@@ -67,7 +124,7 @@ class FindingCategory(Enum):
     PERFORMANCE = "performance"
 
 
-@dataclass
+@dataclass(slots=True)
 class Location:
     """Location of a finding in the code."""
     file: str
@@ -84,7 +141,7 @@ class Location:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class Finding:
     """A code review finding."""
     finding_id: str
@@ -114,7 +171,7 @@ class Finding:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class Fix:
     """A proposed fix for a finding."""
     fix_id: str
@@ -169,9 +226,12 @@ class Event:
     event_type: EventType
     agent_id: str
     data: Dict[str, Any]
-    timestamp: datetime = field(default_factory=datetime.utcnow)
+    timestamp: datetime = field(default_factory=_utcnow)
     event_id: str = field(default_factory=lambda: str(uuid.uuid4()))
     correlation_id: Optional[str] = None
+    # Wire encodings, built on first use and shared by every client
+    _encoded: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+    _sse_frame: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert event to dictionary for JSON serialization."""
@@ -179,14 +239,26 @@ class Event:
             "event_id": self.event_id,
             "event_type": self.event_type.value,
             "agent_id": self.agent_id,
-            "timestamp": self.timestamp.isoformat() + "Z",
+            "timestamp": _format_timestamp(self.timestamp),
             "correlation_id": self.correlation_id,
             "data": self.data
         }
     
     def to_json(self) -> str:
         """Convert event to JSON string."""
-        return json.dumps(self.to_dict())
+        return self.to_bytes().decode("utf-8")
+    
+    def to_bytes(self) -> bytes:
+        """UTF-8 JSON payload, serialized once per event."""
+        if self._encoded is None:
+            self._encoded = orjson.dumps(self.to_dict(), option=orjson.OPT_NON_STR_KEYS)
+        return self._encoded
+    
+    def to_sse(self) -> bytes:
+        """Server-Sent Events frame for this event, built once per event."""
+        if self._sse_frame is None:
+            self._sse_frame = SSE_PREFIX + self.to_bytes() + SSE_SUFFIX
+        return self._sse_frame
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "Event":
@@ -404,18 +476,22 @@ def create_tool_call_result_event(
     duration_ms: int,
     error: Optional[str] = None
 ) -> Event:
-    """Create a tool_call_result event."""
+    """Create a tool_call_result event; large outputs are truncated."""
+    output, truncated = _output_preview(output)
+    data = {
+        "tool_call_id": tool_call_id,
+        "tool_name": tool_name,
+        "success": success,
+        "output": output,
+        "error": error,
+        "duration_ms": duration_ms
+    }
+    if truncated:
+        data["output_truncated"] = True
     return Event(
         event_type=EventType.TOOL_CALL_RESULT,
         agent_id=agent_id,
-        data={
-            "tool_call_id": tool_call_id,
-            "tool_name": tool_name,
-            "success": success,
-            "output": output,
-            "error": error,
-            "duration_ms": duration_ms
-        }
+        data=data
     )
 
 
@@ -106,6 +106,9 @@ async def run_server(host: str = "0.0.0.0", port: int = 8080):
     print(f"   URL: http://{host}:{port}")
     print(f"   Press Ctrl+C to stop\n")
     
+    # No socket tuning needed for the streams: asyncio's TCP transports
+    # (and uvloop's) already set TCP_NODELAY on every accepted connection,
+    # so small WebSocket/SSE frames are not held back by Nagle.
     uvicorn_config = uvicorn.Config(
         app,
         host=host,
@@ -116,6 +119,26 @@ async def run_server(host: str = "0.0.0.0", port: int = 8080):
     await server.serve()
 
 
+def _install_server_loop_policy() -> None:
+    """
+    Make asyncio create libuv loops when uvloop is installed.
+    
+    The server is pure asyncio I/O (WebSocket, SSE, form posts), which is
+    where libuv's loop pays off. uvicorn only picks uvloop by itself in
+    uvicorn.run(); we drive Server.serve() directly, so choose it here.
+    uvloop has no Windows build; winloop is its port there. A policy is used
+    rather than asyncio.Runner(loop_factory=...), which needs Python 3.11.
+    """
+    try:
+        if sys.platform == "win32":
+            import winloop as uvloop
+        else:
+            import uvloop
+    except ImportError:
+        return
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(
@@ -164,6 +187,7 @@ Examples:
     
     try:
         if args.server:
+            _install_server_loop_policy()
             asyncio.run(run_server(args.host, args.port))
         elif args.file:
             results = asyncio.run(analyze_file(args.file, args.json))
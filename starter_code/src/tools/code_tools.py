@@ -4,12 +4,241 @@ Code analysis tools that agents can use.
 
 import ast
 import re
+from bisect import bisect_right
+from collections import deque
+from functools import cached_property, lru_cache
 import subprocess
-import tempfile
-import os
-from typing import Any, Dict, List, Optional, Tuple
+import sys
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from dataclasses import dataclass
 
+
+# Single-pass scanners for verify_fix's issue-specific heuristics.
+_SQL_RE = re.compile(r'\?|%s|execute\(|f["\']|(?i:SELECT)')
+_SQL_HAS_PARAM = 1
+_SQL_HAS_FSTRING = 2
+_SQL_HAS_SELECT = 4
+_XSS_RE = re.compile(r'escape|markupsafe|bleach', re.IGNORECASE)
+_NULL_RE = re.compile(r'is (?:not )?None|if ')
+
+# Secret detection for extract_strings: one regex for Base64/hex-shaped
+# values, plus a keyword scan (Aho-Corasick when pyahocorasick is installed).
+_SECRET_SHAPE_RE = re.compile(r'[A-Za-z0-9+/]{40,}|[a-fA-F0-9]{32,}')
+_SECRET_KEYWORDS = ("password", "secret", "key", "token", "api_key")
+_SECRET_KEYWORD_RE = re.compile("|".join(_SECRET_KEYWORDS), re.IGNORECASE)
+
+try:
+    import ahocorasick
+    
+    _SECRET_AUTOMATON = ahocorasick.Automaton()
+    for _keyword in _SECRET_KEYWORDS:
+        _SECRET_AUTOMATON.add_word(_keyword, _keyword)
+    _SECRET_AUTOMATON.make_automaton()
+except ImportError:
+    _SECRET_AUTOMATON = None
+
+
+def _looks_like_secret(value: str) -> bool:
+    """Whether a string literal looks like an encoded value or names a credential."""
+    if _SECRET_AUTOMATON is not None:
+        if next(_SECRET_AUTOMATON.iter(value.lower()), None) is not None:
+            return True
+    elif _SECRET_KEYWORD_RE.search(value):
+        return True
+    return _SECRET_SHAPE_RE.search(value) is not None
+
+
+# Bootstrap for execute_code: run the program read from stdin as __main__.
+# The source is registered with linecache so tracebacks show its lines, and
+# the bootstrap's own frame is left out of them.
+_EXEC_FILENAME = "<code>"
+_EXEC_STDIN = f"""\
+import linecache, sys, traceback
+source = sys.stdin.read()
+linecache.cache[{_EXEC_FILENAME!r}] = (len(source), None, source.splitlines(True), {_EXEC_FILENAME!r})
+try:
+    exec(compile(source, {_EXEC_FILENAME!r}, "exec"), {{"__name__": "__main__", "__file__": {_EXEC_FILENAME!r}}})
+except SystemExit:
+    raise
+except BaseException as e:
+    traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+    sys.exit(1)
+"""
+
+
+def _check_sql(fixed_code: str) -> Dict[str, Any]:
+    """Check for parameterized queries (one scan, flags collected as bits)."""
+    mask = 0
+    for match in _SQL_RE.finditer(fixed_code):
+        token = match.group()
+        if token[0] == "f" and len(token) == 2:
+            mask |= _SQL_HAS_FSTRING
+        elif len(token) == 6 and token[0] in "sS":
+            mask |= _SQL_HAS_SELECT
+        else:
+            mask |= _SQL_HAS_PARAM
+    passed = bool(mask & _SQL_HAS_PARAM) and not (
+        mask & _SQL_HAS_FSTRING and mask & _SQL_HAS_SELECT
+    )
+    return {
+        "check": "parameterized_query",
+        "passed": passed,
+        "message": "Uses parameterized query" if passed else "May still have injection risk"
+    }
+
+
+def _check_xss(fixed_code: str) -> Dict[str, Any]:
+    """Check for escaping."""
+    has_escape = _XSS_RE.search(fixed_code) is not None
+    return {
+        "check": "xss_escaping",
+        "passed": has_escape,
+        "message": "Uses HTML escaping" if has_escape else "May not have proper escaping"
+    }
+
+
+def _check_null(fixed_code: str) -> Dict[str, Any]:
+    """Check for None checks."""
+    has_check = _NULL_RE.search(fixed_code) is not None
+    return {
+        "check": "null_check",
+        "passed": has_check,
+        "message": "Includes null check" if has_check else "May not check for None"
+    }
+
+
+# issue_type (lowercased) -> (handler, whether a failed check fails the fix)
+_VERIFIERS: Dict[str, Tuple[Callable[[str], Dict[str, Any]], bool]] = {
+    "sql_injection": (_check_sql, True),
+    "sql injection": (_check_sql, True),
+    "xss": (_check_xss, False),
+    "cross-site scripting": (_check_xss, False),
+    "null_reference": (_check_null, False),
+    "null reference": (_check_null, False),
+    "none check": (_check_null, False),
+}
+
+
+def _line_offsets(code: str) -> Tuple[int, ...]:
+    """Start offset of every line in code (same line count as split('\\n'))."""
+    offsets = [0]
+    find = code.find
+    pos = find('\n')
+    while pos != -1:
+        offsets.append(pos + 1)
+        pos = find('\n', pos + 1)
+    return tuple(offsets)
+
+
+def _line_at(code: str, offsets: Tuple[int, ...], index: int) -> str:
+    """Return the 0-indexed line without materializing the full line list."""
+    start = offsets[index]
+    if index + 1 < len(offsets):
+        return code[start:offsets[index + 1] - 1]
+    return code[start:]
+
+
+def line_span(code: str, line_start: int, line_end: int) -> str:
+    """
+    Return 1-indexed lines line_start..line_end of code as one string.
+    
+    Matches '\\n'.join(code.split('\\n')[line_start - 1:line_end]) for
+    line_start >= 1, using the cached line offsets instead of a line list.
+    """
+    offsets = _bundle(code).line_offsets
+    if line_end < line_start or line_start > len(offsets):
+        return ""
+    start = offsets[line_start - 1]
+    if line_end < len(offsets):
+        return code[start:offsets[line_end] - 1]
+    return code[start:]
+
+
+class _CodeBundle:
+    """
+    Per-source artifacts shared by every tool that receives the same code.
+    
+    Fields are computed on first access. The parsed tree is shared, so
+    callers must treat it as read-only.
+    """
+    
+    def __init__(self, code: str):
+        self.code = code
+    
+    @cached_property
+    def tree(self) -> ast.Module:
+        return ast.parse(self.code)
+    
+    @cached_property
+    def line_offsets(self) -> Tuple[int, ...]:
+        return _line_offsets(self.code)
+    
+    @cached_property
+    def lowercase(self) -> str:
+        return self.code.lower()
+
+
+@lru_cache(maxsize=16)
+def _bundle(code: str) -> _CodeBundle:
+    """Return the shared bundle for code (agents pass the same file to many tools)."""
+    return _CodeBundle(code)
+
+
+# Statement-list fields; imports and definitions only ever live in these.
+_BODY_FIELDS = frozenset(("body", "orelse", "finalbody", "handlers", "cases"))
+
+
+def _iter_statements(tree: ast.Module):
+    """
+    Yield statement-level nodes breadth-first, in ast.walk order.
+    
+    Only statement bodies are followed, so expression subtrees (calls,
+    comprehensions, literals) are never visited.
+    """
+    todo = deque(tree.body)
+    while todo:
+        node = todo.popleft()
+        yield node
+        for field in node._fields:
+            if field in _BODY_FIELDS:
+                todo.extend(getattr(node, field))
+
+
+def _summarize(tree: ast.Module) -> Dict[str, Any]:
+    """
+    Count nodes and collect imports/definitions in a single ast.walk.
+    
+    Dispatches on the exact node type rather than chained isinstance checks;
+    output order matches separate walks per category.
+    """
+    imports: List[str] = []
+    from_imports: List[str] = []
+    functions: List[str] = []
+    classes: List[str] = []
+    node_count = 0
+    Import, ImportFrom = ast.Import, ast.ImportFrom
+    FunctionDef, ClassDef = ast.FunctionDef, ast.ClassDef
+    for node in ast.walk(tree):
+        node_count += 1
+        kind = type(node)
+        if kind is Import:
+            imports.append(node.names[0].name)
+        elif kind is ImportFrom:
+            if node.module:
+                from_imports.append(f"{node.module}.{node.names[0].name}")
+        elif kind is FunctionDef:
+            functions.append(node.name)
+        elif kind is ClassDef:
+            classes.append(node.name)
+    return {
+        "node_count": node_count,
+        "imports": imports,
+        "from_imports": from_imports,
+        "functions": functions,
+        "classes": classes,
+    }
+
+
 @dataclass
 class ToolResult:
     """Result from a tool execution."""
@@ -33,30 +262,10 @@ class CodeTools:
             ToolResult with AST dump or error
         """
         try:
-            tree = ast.parse(code)
+            summary = _summarize(_bundle(code).tree)
             return ToolResult(
                 success=True,
-                output={
-                    "valid": True,
-                    "node_count": sum(1 for _ in ast.walk(tree)),
-                    "imports": [
-                        node.names[0].name for node in ast.walk(tree)
-                        if isinstance(node, ast.Import)
-                    ],
-                    "from_imports": [
-                        f"{node.module}.{node.names[0].name}" 
-                        for node in ast.walk(tree)
-                        if isinstance(node, ast.ImportFrom) and node.module
-                    ],
-                    "functions": [
-                        node.name for node in ast.walk(tree)
-                        if isinstance(node, ast.FunctionDef)
-                    ],
-                    "classes": [
-                        node.name for node in ast.walk(tree)
-                        if isinstance(node, ast.ClassDef)
-                    ]
-                }
+                output={"valid": True, **summary}
             )
         except SyntaxError as e:
             return ToolResult(
@@ -102,26 +311,32 @@ class CodeTools:
         Returns:
             ToolResult with the code context
         """
-        lines = code.split('\n')
+        offsets = _bundle(code).line_offsets
+        line_count = len(offsets)
         start = max(0, line_number - context_lines - 1)
-        end = min(len(lines), line_number + context_lines)
+        end = min(line_count, line_number + context_lines)
         
         context = []
         for i in range(start, end):
             prefix = ">>> " if i == line_number - 1 else "    "
-            context.append(f"{i + 1:4d} {prefix}{lines[i]}")
+            context.append(f"{i + 1:4d} {prefix}{_line_at(code, offsets, i)}")
         
         return ToolResult(
             success=True,
             output={
                 "lines": context,
                 "target_line": line_number,
-                "code_snippet": lines[line_number - 1] if 0 < line_number <= len(lines) else ""
+                "code_snippet": _line_at(code, offsets, line_number - 1) if 0 < line_number <= line_count else ""
             }
         )
     
     @staticmethod
-    def search_pattern(code: str, pattern: str, pattern_type: str = "regex") -> ToolResult:
+    def search_pattern(
+        code: str,
+        pattern: str,
+        pattern_type: str = "regex",
+        case_sensitive: bool = False
+    ) -> ToolResult:
         """
         Search for patterns in code.
         
@@ -129,30 +344,53 @@ class CodeTools:
             code: Python source code
             pattern: Pattern to search for
             pattern_type: "regex" or "literal"
+            case_sensitive: Match case exactly instead of ignoring it
             
         Returns:
             ToolResult with matches
         """
         try:
-            lines = code.split('\n')
             matches = []
             
             if pattern_type == "regex":
-                regex = re.compile(pattern, re.IGNORECASE)
-                for i, line in enumerate(lines, 1):
-                    if regex.search(line):
+                regex = re.compile(pattern, 0 if case_sensitive else re.IGNORECASE)
+                search = regex.search
+                for i, line in enumerate(code.split('\n'), 1):
+                    match = search(line)
+                    if match:
                         matches.append({
                             "line": i,
                             "content": line.strip(),
-                            "match": regex.search(line).group()
+                            "match": match.group()
                         })
             else:
-                for i, line in enumerate(lines, 1):
-                    if pattern.lower() in line.lower():
+                bundle = _bundle(code)
+                if case_sensitive:
+                    needle, haystack = pattern, code
+                else:
+                    needle, haystack = pattern.lower(), bundle.lowercase
+                if len(haystack) != len(code):
+                    # Case folding changed the length, so offsets no longer line up
+                    for i, line in enumerate(code.split('\n'), 1):
+                        if needle in line.lower():
+                            matches.append({
+                                "line": i,
+                                "content": line.strip()
+                            })
+                elif '\n' not in needle:
+                    # One scan over the lowercased source, at most one match per line
+                    offsets = bundle.line_offsets
+                    find = haystack.find
+                    pos = find(needle)
+                    while pos != -1:
+                        index = bisect_right(offsets, pos) - 1
                         matches.append({
-                            "line": i,
-                            "content": line.strip()
+                            "line": index + 1,
+                            "content": _line_at(code, offsets, index).strip()
                         })
+                        if index + 1 == len(offsets):
+                            break
+                        pos = find(needle, offsets[index + 1])
             
             return ToolResult(
                 success=True,
@@ -182,8 +420,8 @@ class CodeTools:
             ToolResult with call locations
         """
         try:
-            tree = ast.parse(code)
-            lines = code.split('\n')
+            tree = _bundle(code).tree
+            offsets = None
             calls = []
             
             for node in ast.walk(tree):
@@ -195,10 +433,12 @@ class CodeTools:
                         func_name = node.func.attr
                     
                     if func_name == function_name:
+                        if offsets is None:
+                            offsets = _bundle(code).line_offsets
                         calls.append({
                             "line": node.lineno,
                             "col": node.col_offset,
-                            "code": lines[node.lineno - 1].strip() if node.lineno <= len(lines) else ""
+                            "code": _line_at(code, offsets, node.lineno - 1).strip() if node.lineno <= len(offsets) else ""
                         })
             
             return ToolResult(
@@ -228,10 +468,10 @@ class CodeTools:
             ToolResult with import analysis
         """
         try:
-            tree = ast.parse(code)
+            tree = _bundle(code).tree
             imports = []
             
-            for node in ast.walk(tree):
+            for node in _iter_statements(tree):
                 if isinstance(node, ast.Import):
                     for alias in node.names:
                         imports.append({
@@ -286,7 +526,7 @@ class CodeTools:
             ToolResult with string literals
         """
         try:
-            tree = ast.parse(code)
+            tree = _bundle(code).tree
             strings = []
             
             for node in ast.walk(tree):
@@ -298,18 +538,7 @@ class CodeTools:
                     })
             
             # Check for potential secrets
-            secret_patterns = [
-                r'[A-Za-z0-9+/]{40,}',  # Base64-like
-                r'[a-f0-9]{32,}',  # Hex strings
-                r'password|secret|key|token|api_key',  # Keywords
-            ]
-            
-            potential_secrets = []
-            for s in strings:
-                for pattern in secret_patterns:
-                    if re.search(pattern, s['value'], re.IGNORECASE):
-                        potential_secrets.append(s)
-                        break
+            potential_secrets = [s for s in strings if _looks_like_secret(s['value'])]
             
             return ToolResult(
                 success=True,
@@ -375,37 +604,14 @@ class CodeTools:
             })
         
         # Check 3: Issue-specific checks
-        if issue_type.lower() in ["sql_injection", "sql injection"]:
-            # Check for parameterized queries
-            has_param = "?" in fixed_code or "%s" in fixed_code or "execute(" in fixed_code
-            has_fstring = "f\"" in fixed_code or "f'" in fixed_code
-            passed = has_param and not (has_fstring and "SELECT" in fixed_code.upper())
-            checks.append({
-                "check": "parameterized_query",
-                "passed": passed,
-                "message": "Uses parameterized query" if passed else "May still have injection risk"
-            })
-            if not passed:
+        verifier = _VERIFIERS.get(issue_type.lower())
+        if verifier is not None:
+            handler, required = verifier
+            check = handler(fixed_code)
+            checks.append(check)
+            if required and not check["passed"]:
                 all_passed = False
         
-        elif issue_type.lower() in ["xss", "cross-site scripting"]:
-            # Check for escaping
-            has_escape = any(x in fixed_code.lower() for x in ["escape", "html.escape", "markupsafe", "bleach"])
-            checks.append({
-                "check": "xss_escaping",
-                "passed": has_escape,
-                "message": "Uses HTML escaping" if has_escape else "May not have proper escaping"
-            })
-        
-        elif issue_type.lower() in ["null_reference", "null reference", "none check"]:
-            # Check for None checks
-            has_check = "is not None" in fixed_code or "is None" in fixed_code or "if " in fixed_code
-            checks.append({
-                "check": "null_check",
-                "passed": has_check,
-                "message": "Includes null check" if has_check else "May not check for None"
-            })
-        
         return ToolResult(
             success=all_passed,
             output={
@@ -427,6 +633,12 @@ class CodeTools:
         SECURITY NOTE: This should be properly sandboxed in production.
         For this assessment, basic subprocess isolation is acceptable.
         
+        The code is piped to an isolated interpreter (python -I), so
+        PYTHON* environment variables and user site-packages are ignored
+        and neither the working directory nor a script directory is on
+        sys.path. It runs as __main__ with __file__ set to "<code>", which
+        is not a path on disk.
+        
         Args:
             code: Python code to execute
             timeout: Execution timeout in seconds
@@ -435,16 +647,11 @@ class CodeTools:
         Returns:
             ToolResult with execution results
         """
-        temp_path = None
         try:
-            # Write code to temporary file
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
-                f.write(code)
-                temp_path = f.name
-            
-            # Execute in subprocess with timeout
+            # Feed the source over stdin; no temporary file to write or unlink
             result = subprocess.run(
-                ['python', temp_path],
+                [sys.executable, '-I', '-c', _EXEC_STDIN],
+                input=code,
                 capture_output=capture_output,
                 timeout=timeout,
                 text=True
@@ -473,13 +680,6 @@ class CodeTools:
                 output={"executed": False, "reason": "error"},
                 error=str(e)
             )
-        finally:
-            # Clean up temp file
-            if temp_path and os.path.exists(temp_path):
-                try:
-                    os.unlink(temp_path)
-                except:
-                    pass
 
 
 # Tool definitions for Claude API
@@ -554,6 +754,11 @@ TOOL_DEFINITIONS = [
                     "enum": ["regex", "literal"],
                     "description": "Type of pattern matching",
                     "default": "regex"
+                },
+                "case_sensitive": {
+                    "type": "boolean",
+                    "description": "Match letter case exactly (default: case-insensitive)",
+                    "default": False
                 }
             },
             "required": ["code", "pattern"]
@@ -705,6 +910,34 @@ def _search_security_docs_wrapper(query: str, category: Optional[str] = None) ->
         )
 
 
+# Dispatch table for execute_tool, built once at import time
+_TOOL_MAP: Dict[str, Callable[[Dict[str, Any]], ToolResult]] = {
+    "parse_ast": lambda i: CodeTools.parse_ast(i["code"]),
+    "check_syntax": lambda i: CodeTools.check_syntax(i["code"]),
+    "get_line_context": lambda i: CodeTools.get_line_context(
+        i["code"], i["line_number"], i.get("context_lines", 3)
+    ),
+    "search_pattern": lambda i: CodeTools.search_pattern(
+        i["code"], i["pattern"], i.get("pattern_type", "regex"),
+        i.get("case_sensitive", False)
+    ),
+    "find_function_calls": lambda i: CodeTools.find_function_calls(
+        i["code"], i["function_name"]
+    ),
+    "analyze_imports": lambda i: CodeTools.analyze_imports(i["code"]),
+    "extract_strings": lambda i: CodeTools.extract_strings(i["code"]),
+    "verify_fix": lambda i: CodeTools.verify_fix(
+        i["original_code"], i["fixed_code"], i["issue_type"]
+    ),
+    "execute_code": lambda i: CodeTools.execute_code(
+        i["code"], i.get("timeout", 30)
+    ),
+    "search_security_docs": lambda i: _search_security_docs_wrapper(
+        i["query"], i.get("category")
+    )
+}
+
+
 def execute_tool(tool_name: str, tool_input: Dict[str, Any]) -> ToolResult:
     """
     Execute a tool by name.
@@ -716,32 +949,8 @@ def execute_tool(tool_name: str, tool_input: Dict[str, Any]) -> ToolResult:
     Returns:
         ToolResult from execution
     """
-    tool_map = {
-        "parse_ast": lambda i: CodeTools.parse_ast(i["code"]),
-        "check_syntax": lambda i: CodeTools.check_syntax(i["code"]),
-        "get_line_context": lambda i: CodeTools.get_line_context(
-            i["code"], i["line_number"], i.get("context_lines", 3)
-        ),
-        "search_pattern": lambda i: CodeTools.search_pattern(
-            i["code"], i["pattern"], i.get("pattern_type", "regex")
-        ),
-        "find_function_calls": lambda i: CodeTools.find_function_calls(
-            i["code"], i["function_name"]
-        ),
-        "analyze_imports": lambda i: CodeTools.analyze_imports(i["code"]),
-        "extract_strings": lambda i: CodeTools.extract_strings(i["code"]),
-        "verify_fix": lambda i: CodeTools.verify_fix(
-            i["original_code"], i["fixed_code"], i["issue_type"]
-        ),
-        "execute_code": lambda i: CodeTools.execute_code(
-            i["code"], i.get("timeout", 30)
-        ),
-        "search_security_docs": lambda i: _search_security_docs_wrapper(
-            i["query"], i.get("category")
-        )
-    }
-    
-    if tool_name not in tool_map:
+    handler = _TOOL_MAP.get(tool_name)
+    if handler is None:
         return ToolResult(
             success=False,
             output=None,
@@ -749,7 +958,7 @@ def execute_tool(tool_name: str, tool_input: Dict[str, Any]) -> ToolResult:
         )
     
     try:
-        return tool_map[tool_name](tool_input)
+        return handler(tool_input)
     except Exception as e:
         return ToolResult(
             success=False,
@@ -4,16 +4,25 @@ Provides WebSocket and SSE endpoints for real-time event streaming.
 """
 
 import asyncio
-import json
+import gzip
+import hashlib
+import itertools
 import logging
-from typing import Optional
+import re
+import zlib
+from contextlib import asynccontextmanager, nullcontext
+from functools import lru_cache
+from typing import AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
 from pathlib import Path
+from urllib.parse import parse_qsl
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request, Form
-from fastapi.responses import HTMLResponse, StreamingResponse, JSONResponse
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request
+from fastapi.responses import HTMLResponse, StreamingResponse, JSONResponse, Response
+from fastapi.staticfiles import StaticFiles
+import orjson
 
 from ..events import EventBus, event_bus as global_event_bus
+from ..events.event_types import Event, EventType, SSE_PREFIX, SSE_SUFFIX
 from ..agents.code_review_workflow import CodeReviewWorkflow
 from ..config import config
 
@@ -22,80 +31,381 @@ logger = logging.getLogger(__name__)
 CURRENT_DIR = Path(__file__).parent
 STATIC_DIR = CURRENT_DIR.parent.parent / "static"
 
+# Review ids are process-unique; id(task) can be reused once a task is freed.
+# They only ever go out as strings, so the counter yields them as such.
+_next_review_id = map(str, itertools.count(1)).__next__
+
+# Reviews beyond config.max_pending_reviews (running or waiting for a slot)
+# are rejected rather than queued without limit.
+_BUSY_MESSAGE = "Too many reviews in progress, try again shortly"
+_REVIEW_REJECTED = orjson.dumps({"type": "review_rejected", "error": _BUSY_MESSAGE})
+_REVIEW_TOO_LARGE = orjson.dumps({
+    "type": "review_rejected",
+    "error": f"Code exceeds the {config.max_file_size} character limit",
+})
+
+# Keepalive pings in the two spellings JSON encoders produce, as text or
+# binary frames, are answered without parsing.
+_PING_FRAMES = frozenset(
+    form for text in ('{"type":"ping"}', '{"type": "ping"}') for form in (text, text.encode())
+)
+_PONG = orjson.dumps({"type": "pong"})
+
+# Largest client frame parsed; JSON escaping can roughly double the code
+MAX_CLIENT_FRAME = 2 * config.max_file_size + 4096
+
+# Largest /api/review body read; percent-encoding can triple the code
+MAX_FORM_BODY = 3 * config.max_file_size + 4096
+
+# In-flight reviews keyed by (event bus, blake2b of filename + code): the
+# review id and the task running it. Identical submissions, whether from
+# the HTTP/WebSocket endpoints or run_review(), join the running task.
+_inflight_reviews: Dict[Tuple[EventBus, bytes], Tuple[str, asyncio.Task]] = {}
+# Ids of in-flight reviews that a later submission joined; the socket that
+# started one must not cancel it on the way out
+_shared_reviews: Set[str] = set()
+
+# Stream batching (SSE and WebSocket): events arriving within the window
+# are written together, capped so a burst never delays the first event by
+# much.
+STREAM_BATCH_WINDOW_S = 0.005
+STREAM_BATCH_MAX_EVENTS = 64
+STREAM_BATCH_MAX_BYTES = 16 * 1024
+# Milestones the UI reacts to (buttons, plan, status) skip the window
+_FLUSH_NOW_EVENTS = frozenset({
+    EventType.PLAN_CREATED,
+    EventType.AGENT_COMPLETED,
+    EventType.AGENT_ERROR,
+    EventType.FINAL_REPORT,
+    EventType.REVIEW_STARTED,
+    EventType.REVIEW_COMPLETED,
+})
+
+# A WebSocket client that has not taken a batch within this long is closed
+# instead of pinning its forwarder; it can reconnect.
+STREAM_SEND_TIMEOUT_S = 30.0
+_CLOSE_TRY_AGAIN_LATER = 1013
+
+# One app-wide timer wakes idle SSE readers so they send a keepalive,
+# instead of every reader re-arming its own timeout per event.
+SSE_HEARTBEAT_S = 25.0
+SSE_KEEPALIVE = SSE_PREFIX + orjson.dumps({"type": "keepalive", "dropped": 0}) + SSE_SUFFIX
+# Sent first on every stream: how long EventSource waits before reconnecting
+SSE_RETRY_MS = 3000
+SSE_RETRY = f"retry: {SSE_RETRY_MS}\n\n".encode("ascii")
+
+# Streams are gzipped when the client accepts it; a middle level keeps the
+# per-batch CPU cost low on a long-lived connection.
+SSE_GZIP_LEVEL = 6
+
+
+# CORS headers are fixed per allowed origin, so build them once
+_CORS_ALLOW_ORIGIN = (b"access-control-allow-origin", b"*")
+_CORS_VARY_ORIGIN = (b"vary", b"Origin")
+_CORS_PREFLIGHT_REST = [
+    (b"access-control-allow-methods", b"GET, POST, OPTIONS"),
+    (b"access-control-allow-headers", b"*"),
+    (b"access-control-max-age", b"600"),
+    (b"content-length", b"0"),
+]
+_CORS_PREFLIGHT_HEADERS = [_CORS_ALLOW_ORIGIN, *_CORS_PREFLIGHT_REST]
+_CORS_PREFLIGHT_DENIED = [_CORS_VARY_ORIGIN, (b"content-length", b"0")]
+
+
+class OrjsonResponse(JSONResponse):
+    """
+    JSONResponse encoded with orjson.
+    
+    FastAPI's own ORJSONResponse is deprecated in favour of response
+    models; these endpoints return plain dicts, so keep the equivalent here.
+    """
+    
+    def render(self, content) -> bytes:
+        return orjson.dumps(content)
+
+
+class StaticCORSMiddleware:
+    """
+    Minimal ASGI CORS middleware with precomputed headers.
+    
+    Answers preflight requests directly and appends the allow-origin
+    header to every other HTTP response; WebSocket scopes pass through.
+    With "*" among the allowed origins every response is the same;
+    otherwise a listed Origin is echoed back (with Vary: Origin) and any
+    other origin gets no CORS headers.
+    """
+    
+    def __init__(self, app, allowed_origins: Optional[List[str]] = None):
+        self.app = app
+        if allowed_origins is None or "*" in allowed_origins:
+            self._by_origin = None
+        else:
+            # origin -> (simple response headers, preflight headers)
+            self._by_origin = {}
+            for origin in allowed_origins:
+                allow = (b"access-control-allow-origin", origin.encode("latin-1"))
+                self._by_origin[origin.encode("latin-1")] = (
+                    [allow, _CORS_VARY_ORIGIN],
+                    [allow, _CORS_VARY_ORIGIN, *_CORS_PREFLIGHT_REST],
+                )
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        if self._by_origin is None:
+            extra, preflight = [_CORS_ALLOW_ORIGIN], _CORS_PREFLIGHT_HEADERS
+        else:
+            origin = next((value for name, value in scope["headers"] if name == b"origin"), None)
+            extra, preflight = self._by_origin.get(origin, ([_CORS_VARY_ORIGIN], None))
+        
+        if scope["method"] == "OPTIONS" and any(
+            name == b"access-control-request-method" for name, _ in scope["headers"]
+        ):
+            if preflight is None:
+                await send({"type": "http.response.start", "status": 400, "headers": _CORS_PREFLIGHT_DENIED})
+            else:
+                await send({"type": "http.response.start", "status": 200, "headers": preflight})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        
+        async def send_with_cors(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), *extra]
+            await send(message)
+        
+        await self.app(scope, receive, send_with_cors)
+
 
 def create_app(event_bus: Optional[EventBus] = None) -> FastAPI:
-    app = FastAPI(title="Multi-Agent Code Review System", version="1.0.0")
+    bus = event_bus or global_event_bus
     
-    app.add_middleware(
-        CORSMiddleware,
-        allow_origins=["*"],
-        allow_credentials=True,
-        allow_methods=["*"],
-        allow_headers=["*"],
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        nonlocal review_slots
+        # A fresh semaphore per run, so it is never bound to a loop from an
+        # earlier one
+        review_slots = asyncio.Semaphore(config.max_concurrent_reviews)
+        # Load and compress the landing page before the first request needs it
+        _index_page()
+        # Likewise build the shared workflow (API clients, compiled graph)
+        # now rather than inside the first review
+        if config.anthropic_api_key:
+            try:
+                _workflow_for(bus)
+            except Exception as e:
+                logger.warning(f"Could not prepare the review workflow: {e}")
+        heartbeat = asyncio.create_task(_heartbeat(bus))
+        try:
+            yield
+        finally:
+            heartbeat.cancel()
+            # Don't leave reviews running (and spending tokens) past shutdown
+            reviews = list(active_reviews.values())
+            for task in reviews:
+                task.cancel()
+            await asyncio.gather(*reviews, return_exceptions=True)
+    
+    app = FastAPI(
+        title="Multi-Agent Code Review System",
+        version="1.0.0",
+        lifespan=lifespan,
+        default_response_class=OrjsonResponse,
     )
     
-    bus = event_bus or global_event_bus
+    app.add_middleware(StaticCORSMiddleware, allowed_origins=config.allowed_origins)
+    
+    # Assets next to a custom index.html; FileResponse hands them to the
+    # server's zero-copy send where available.
+    if STATIC_DIR.is_dir():
+        app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
+    
     active_reviews = {}
+    # Caps concurrent reviews so queued ones wait instead of competing with
+    # the streams for the event loop.
+    review_slots = asyncio.Semaphore(config.max_concurrent_reviews)
+    
+    def track_review(code: str, filename: str) -> Optional[Tuple[str, bool]]:
+        """
+        Start a review task under a fresh id; it is forgotten once done.
+        
+        Returns (review_id, created). Resubmitting a review that is still
+        running returns its id with created=False instead of taking
+        another slot. Returns None without starting anything when
+        config.max_pending_reviews reviews are already running or queued.
+        """
+        key = (bus, _review_digest(code, filename))
+        running = _inflight_reviews.get(key)
+        if running is not None:
+            _shared_reviews.add(running[0])
+            return running[0], False
+        if len(active_reviews) >= config.max_pending_reviews:
+            return None
+        review_id, task = _start_review(key, code, filename, review_slots)
+        active_reviews[review_id] = task
+        task.add_done_callback(lambda _: active_reviews.pop(review_id, None))
+        return review_id, True
     
     @app.get("/", response_class=HTMLResponse)
-    async def index():
-        html_path = STATIC_DIR / "index.html"
-        if html_path.exists():
-            return HTMLResponse(content=html_path.read_text())
-        return HTMLResponse(content=get_embedded_html())
+    async def index(request: Request):
+        body, gzipped, digest = _index_page()
+        use_gzip = "gzip" in request.headers.get("accept-encoding", "")
+        # Each encoding is its own representation, so it gets its own ETag
+        etag = f'"{digest}-gz"' if use_gzip else f'"{digest}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+        if use_gzip:
+            headers["Content-Encoding"] = "gzip"
+            return HTMLResponse(content=gzipped, headers=headers)
+        return HTMLResponse(content=body, headers=headers)
     
     @app.websocket("/ws/review")
     async def websocket_endpoint(websocket: WebSocket):
         await websocket.accept()
-        bus.register_websocket(websocket)
+        forwarder = asyncio.create_task(_forward_events(websocket, bus))
+        # Reviews this socket started (not ones it joined); see the cleanup
+        # in finally
+        own_reviews = []
         
         try:
             while True:
-                data = await websocket.receive_json()
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(message.get("code", 1000))
+                raw = message.get("bytes") or message.get("text")
+                if raw in _PING_FRAMES:
+                    await websocket.send_bytes(_PONG)
+                    continue
+                data = _parse_client_message(raw)
+                if data is None:
+                    continue
                 
                 if data.get("type") == "start_review":
                     code = data.get("code", "")
                     filename = data.get("filename", "code.py")
+                    if not isinstance(code, str) or not isinstance(filename, str):
+                        continue
                     
-                    if code:
-                        task = asyncio.create_task(run_review(code, filename, bus))
-                        review_id = id(task)
-                        active_reviews[review_id] = task
-                        await websocket.send_json({"type": "review_accepted", "review_id": str(review_id)})
+                    if len(code) > config.max_file_size:
+                        await websocket.send_bytes(_REVIEW_TOO_LARGE)
+                    elif code:
+                        tracked = track_review(code, filename)
+                        if tracked is None:
+                            await websocket.send_bytes(_REVIEW_REJECTED)
+                        else:
+                            review_id, created = tracked
+                            if created:
+                                own_reviews.append(review_id)
+                            await websocket.send_bytes(orjson.dumps({"type": "review_accepted", "review_id": review_id}))
                 
                 elif data.get("type") == "ping":
-                    await websocket.send_json({"type": "pong"})
+                    await websocket.send_bytes(_PONG)
                     
         except WebSocketDisconnect:
             logger.info("WebSocket client disconnected")
         except Exception as e:
             logger.error(f"WebSocket error: {e}")
         finally:
-            bus.unregister_websocket(websocket)
+            forwarder.cancel()
+            await asyncio.gather(forwarder, return_exceptions=True)
+            # Events go to every stream on the bus, so a review is only
+            # orphaned once no stream at all is left to watch it, and only
+            # if no other submission joined it.
+            if not bus.stream_count:
+                orphaned = [
+                    active_reviews[rid] for rid in own_reviews
+                    if rid in active_reviews and rid not in _shared_reviews
+                ]
+                for task in orphaned:
+                    task.cancel()
+                await asyncio.gather(*orphaned, return_exceptions=True)
     
     @app.get("/stream/events")
     async def sse_endpoint(request: Request):
         async def event_generator():
-            queue = asyncio.Queue()
-            async def handler(event): await queue.put(event)
-            bus.subscribe("*", handler)
+            cursor = bus.last_seq
+            # The bus ring is bounded, so a reader that falls too far behind
+            # loses the oldest events instead of pinning them in memory; each
+            # loss is reported ahead of the next batch and the running total
+            # goes out with each keepalive so the client can re-sync.
+            dropped = 0
+            backlog = False
+            waiter = bus.open_stream()
+            # One long-lived receive task instead of polling the channel per
+            # event; a disconnect wakes the reader straight away.
+            disconnect = asyncio.create_task(_wait_disconnect(request))
+            disconnect.add_done_callback(lambda _: waiter.set())
             try:
-                while True:
-                    if await request.is_disconnected(): break
-                    try:
-                        event = await asyncio.wait_for(queue.get(), timeout=30.0)
-                        yield f"data: {json.dumps(event.to_dict())}\n\n"
-                    except asyncio.TimeoutError:
-                        yield f"data: {json.dumps({'type': 'keepalive'})}\n\n"
+                yield SSE_RETRY
+                while not disconnect.done():
+                    entries = await bus.wait_events(cursor, waiter=waiter)
+                    if disconnect.done():
+                        break
+                    if not entries:
+                        # Woken without new events: heartbeat tick
+                        if dropped:
+                            keepalive = {"type": "keepalive", "dropped": dropped}
+                            yield SSE_PREFIX + orjson.dumps(keepalive) + SSE_SUFFIX
+                        else:
+                            yield SSE_KEEPALIVE
+                        continue
+                    # A backlog left by the batch caps is already here
+                    if not backlog:
+                        entries = await _gather_burst(bus, cursor, entries)
+                    missed = bus.missed_since(cursor)
+                    frames, cursor = _take_batch(entries, Event.to_sse)
+                    backlog = cursor != entries[-1][0]
+                    if missed:
+                        dropped += missed
+                        logger.warning(f"SSE client fell behind, dropped {missed} events")
+                        frames.insert(0, SSE_PREFIX + _dropped_notice(missed) + SSE_SUFFIX)
+                    yield b"".join(frames)
             finally:
-                bus.unsubscribe("*", handler)
-        return StreamingResponse(event_generator(), media_type="text/event-stream",
-                                  headers={"Cache-Control": "no-cache", "Connection": "keep-alive"})
+                disconnect.cancel()
+                bus.close_stream(waiter)
+        headers = {
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "Vary": "Accept-Encoding",
+            # Reverse proxies (nginx) would otherwise hold batches back
+            "X-Accel-Buffering": "no",
+        }
+        stream = event_generator()
+        if "gzip" in request.headers.get("accept-encoding", ""):
+            headers["Content-Encoding"] = "gzip"
+            stream = _gzip_stream(stream)
+        return StreamingResponse(stream, media_type="text/event-stream", headers=headers)
     
     @app.post("/api/review")
-    async def start_review(code: str = Form(...), filename: str = Form("code.py")):
-        task = asyncio.create_task(run_review(code, filename, bus))
-        return JSONResponse({"status": "started", "review_id": str(id(task))})
+    async def start_review(request: Request):
+        # Two known fields: parse urlencoded bodies directly and leave the
+        # multipart parser for actual multipart uploads.
+        if request.headers.get("content-type", "").startswith("multipart/"):
+            fields = await request.form()
+        else:
+            raw = await _read_body(request, MAX_FORM_BODY)
+            if raw is None:
+                return OrjsonResponse({"status": "rejected", "error": "Request body too large"}, status_code=413)
+            try:
+                fields = dict(parse_qsl(raw.decode("utf-8", "replace"), max_num_fields=4))
+            except ValueError:
+                return OrjsonResponse({"status": "rejected", "error": "Malformed form body"}, status_code=400)
+        code = fields.get("code")
+        filename = fields.get("filename", "code.py")
+        if not isinstance(code, str) or not code or not isinstance(filename, str):
+            return OrjsonResponse({"status": "rejected", "error": "Missing code"}, status_code=422)
+        if len(code) > config.max_file_size:
+            return OrjsonResponse(
+                {"status": "rejected", "error": f"Code exceeds the {config.max_file_size} character limit"},
+                status_code=413,
+            )
+        
+        tracked = track_review(code, filename)
+        if tracked is None:
+            return OrjsonResponse({"status": "rejected", "error": _BUSY_MESSAGE}, status_code=503)
+        return OrjsonResponse({"status": "started", "review_id": tracked[0]})
     
     @app.get("/api/health")
     async def health():
@@ -104,18 +414,234 @@ def create_app(event_bus: Optional[EventBus] = None) -> FastAPI:
     return app
 
 
-async def run_review(code: str, filename: str, event_bus: EventBus) -> dict:
+def _parse_client_message(raw) -> Optional[dict]:
+    """
+    Decode a client WebSocket frame (text or binary JSON).
+    
+    Oversized or malformed frames are dropped before or during parsing so
+    they never reach the review path.
+    """
+    if not raw:
+        return None
+    if len(raw) > MAX_CLIENT_FRAME:
+        logger.warning(f"Dropping {len(raw)}-byte WebSocket frame")
+        return None
+    try:
+        data = orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        logger.warning("Dropping malformed WebSocket frame")
+        return None
+    return data if isinstance(data, dict) else None
+
+
+async def _gather_burst(bus: EventBus, cursor: int, entries: List[Tuple[int, Event]]) -> List[Tuple[int, Event]]:
+    """
+    Give a burst a moment to land so it goes out in one write.
+    
+    Full batches and batches holding a milestone event are sent at once.
+    """
+    if len(entries) < STREAM_BATCH_MAX_EVENTS and not any(
+        event.event_type in _FLUSH_NOW_EVENTS for _, event in entries
+    ):
+        await asyncio.sleep(STREAM_BATCH_WINDOW_S)
+        # The ring may have been cleared meanwhile; keep what we already have
+        return bus.events_since(cursor) or entries
+    return entries
+
+
+def _take_batch(entries: List[Tuple[int, Event]], encode: Callable[[Event], bytes]) -> Tuple[List[bytes], int]:
+    """
+    Encode ring entries up to the batch caps.
+    
+    Returns:
+        The encoded events and the sequence number of the last one taken;
+        entries past the caps are left for the next batch.
+    """
+    frames = []
+    size = 0
+    for seq, event in entries:
+        frame = encode(event)
+        frames.append(frame)
+        size += len(frame)
+        if len(frames) >= STREAM_BATCH_MAX_EVENTS or size >= STREAM_BATCH_MAX_BYTES:
+            break
+    return frames, seq
+
+
+def _dropped_notice(count: int) -> bytes:
+    """Encode the message telling a stream client that count events were lost."""
+    return orjson.dumps({"type": "dropped", "count": count})
+
+
+async def _forward_events(websocket: WebSocket, bus: EventBus) -> None:
+    """
+    Send bus events to one WebSocket client, batched as JSON arrays.
+    
+    Reads the bus ring by cursor like the SSE endpoint, so a burst of
+    events goes out as one frame instead of one frame per event. Nothing
+    queues per socket: a client that falls behind loses the oldest events,
+    and one that stops reading altogether is disconnected.
+    """
+    cursor = bus.last_seq
+    backlog = False
+    waiter = bus.open_stream()
+    try:
+        while True:
+            entries = await bus.wait_events(cursor, waiter=waiter)
+            if not entries:
+                continue
+            if not backlog:
+                entries = await _gather_burst(bus, cursor, entries)
+            missed = bus.missed_since(cursor)
+            frames, cursor = _take_batch(entries, Event.to_bytes)
+            backlog = cursor != entries[-1][0]
+            if missed:
+                logger.warning(f"WebSocket client fell behind, dropped {missed} events")
+                frames.insert(0, _dropped_notice(missed))
+            try:
+                await asyncio.wait_for(
+                    websocket.send_bytes(b"[" + b",".join(frames) + b"]"), STREAM_SEND_TIMEOUT_S
+                )
+            except asyncio.TimeoutError:
+                logger.warning("WebSocket client stopped reading, closing it")
+                await websocket.close(code=_CLOSE_TRY_AGAIN_LATER)
+                return
+    except Exception as e:
+        logger.debug(f"WebSocket forwarding stopped: {e}")
+    finally:
+        bus.close_stream(waiter)
+
+
+async def _gzip_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """
+    Gzip a streaming body, flushing after every chunk.
+    
+    Z_SYNC_FLUSH ends each write on a byte boundary, so the client can
+    decode every SSE batch as soon as it arrives; the compressor keeps its
+    window across chunks, so repeated JSON keys compress away.
+    """
+    compressor = zlib.compressobj(SSE_GZIP_LEVEL, zlib.DEFLATED, 31)
+    try:
+        async for chunk in chunks:
+            yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    finally:
+        await chunks.aclose()
+
+
+async def _read_body(request: Request, limit: int) -> Optional[bytes]:
+    """Read a request body, giving up (None) as soon as it exceeds limit."""
+    chunks = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > limit:
+            return None
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+async def _wait_disconnect(request: Request) -> None:
+    """Return once the client of a streaming response has gone away."""
+    while (await request.receive())["type"] != "http.disconnect":
+        pass
+
+
+async def _heartbeat(bus: EventBus) -> None:
+    """Periodically wake idle stream readers so they emit a keepalive."""
+    while True:
+        await asyncio.sleep(SSE_HEARTBEAT_S)
+        bus.wake_streams()
+
+
+# Indentation and blank lines in the embedded page; it has no <pre>, no
+# textarea content and no multi-line JS strings, so they carry no meaning.
+_LEADING_WHITESPACE = re.compile(r"\n\s+")
+
+
+@lru_cache(maxsize=1)
+def _index_page() -> Tuple[bytes, bytes, str]:
+    """Load the landing page once; returns (body, gzipped body, ETag base)."""
+    html_path = STATIC_DIR / "index.html"
+    if html_path.exists():
+        body = html_path.read_bytes()
+    else:
+        body = _LEADING_WHITESPACE.sub("\n", get_embedded_html()).encode("utf-8")
+    gzipped = gzip.compress(body, compresslevel=9, mtime=0)
+    return body, gzipped, hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def _review_digest(code: str, filename: str) -> bytes:
+    """Key identifying a submission: blake2b of filename and code."""
+    return hashlib.blake2b(
+        filename.encode("utf-8") + b"\0" + code.encode("utf-8"), digest_size=16
+    ).digest()
+
+
+def _start_review(
+    key: Tuple[EventBus, bytes],
+    code: str,
+    filename: str,
+    slots: Optional[asyncio.Semaphore] = None,
+) -> Tuple[str, asyncio.Task]:
+    """Start a review under a fresh id and register it until it finishes."""
+    task = asyncio.create_task(_execute_review(code, filename, key[0], slots))
+    review_id = _next_review_id()
+    entry = _inflight_reviews[key] = (review_id, task)
+    
+    def forget(_):
+        _inflight_reviews.pop(key, None)
+        _shared_reviews.discard(review_id)
+    
+    task.add_done_callback(forget)
+    return entry
+
+
+async def run_review(
+    code: str,
+    filename: str,
+    event_bus: EventBus,
+    slots: Optional[asyncio.Semaphore] = None,
+) -> dict:
+    # Identical submissions while one is still running share its result
+    # (and its event stream) instead of paying for a second set of LLM calls.
+    # A new review waits on slots, when given, before it starts.
+    key = (event_bus, _review_digest(code, filename))
+    running = _inflight_reviews.get(key)
+    if running is not None:
+        _shared_reviews.add(running[0])
+        return await asyncio.shield(running[1])
+    _, task = _start_review(key, code, filename, slots)
+    return await task
+
+
+@lru_cache(maxsize=4)
+def _workflow_for(event_bus: EventBus) -> CodeReviewWorkflow:
+    """
+    One workflow per bus, shared by every review published on it.
+    
+    Building a workflow creates the agents' API clients and compiles the
+    graph; all per-review data lives in the graph state, so reviews can
+    run on the same instance concurrently.
+    """
+    return CodeReviewWorkflow(event_bus)
+
+
+async def _execute_review(
+    code: str,
+    filename: str,
+    event_bus: EventBus,
+    slots: Optional[asyncio.Semaphore] = None,
+) -> dict:
     try:
         config.validate()
-        orchestrator = CodeReviewWorkflow(event_bus)
-        return await orchestrator.review_code(code, filename)
+        async with slots or nullcontext():
+            return await _workflow_for(event_bus).review_code(code, filename)
     except Exception as e:
         logger.error(f"Review failed: {e}", exc_info=True)
         return {"status": "failed", "error": str(e)}
 
 
-def get_embedded_html() -> str:
-    return """<!DOCTYPE html>
+EMBEDDED_HTML = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -263,7 +789,9 @@ def get_embedded_html() -> str:
         }
         .plan-item.running { border-left-color: #1f6feb; background: #1f6feb15; }
         .plan-item.completed { border-left-color: #238636; background: #23863615; }
+        .plan-item.failed { border-left-color: #da3633; background: #da363315; }
         .plan-item .check { color: #3fb950; margin-right: 8px; }
+        .plan-item.failed .check { color: #f85149; }
         .plan-badge { font-size: 10px; padding: 2px 6px; border-radius: 4px; background: #30363d; }
         
         /* Agent Status */
@@ -339,6 +867,8 @@ def get_embedded_html() -> str:
             padding: 8px 10px; 
             margin-bottom: 6px;
             font-size: 11px;
+            content-visibility: auto;
+            contain-intrinsic-size: auto 110px;
         }
         .tool-card:last-child { margin-bottom: 0; }
         .tool-row1 { display: flex; justify-content: space-between; align-items: center; margin-bottom: 6px; }
@@ -389,8 +919,13 @@ def get_embedded_html() -> str:
             overflow-y: auto; 
             white-space: pre-wrap; 
             word-break: break-word;
+            /* Fixed-size box: text appended while streaming never
+               invalidates layout or paint outside the pane */
+            contain: strict;
+            overflow-anchor: none;
         }
-        .think-content:empty::before { content: 'Waiting for thoughts...'; color: #484f58; font-style: italic; }
+        .think-content.streaming { will-change: scroll-position; }
+        .think-text:empty::before { content: 'Waiting for thoughts...'; color: #484f58; font-style: italic; }
         
         /* Findings */
         .findings-hdr-stats { display: flex; gap: 10px; font-size: 11px; }
@@ -401,11 +936,15 @@ def get_embedded_html() -> str:
         .fs-low { background: #23863633; color: #3fb950; }
         
         .findings-list { display: flex; flex-direction: column; gap: 8px; }
+        .scroll-tail { height: 0; flex-shrink: 0; }
         .finding-card { 
             background: #0d1117; 
             border: 1px solid #30363d; 
             border-radius: 6px; 
             padding: 12px;
+            /* Off-screen cards skip layout and paint, so long reviews stay cheap */
+            content-visibility: auto;
+            contain-intrinsic-size: auto 120px;
         }
         .finding-card.critical { border-left: 4px solid #da3633; }
         .finding-card.high { border-left: 4px solid #f0883e; }
@@ -536,7 +1075,7 @@ def get_embedded_html() -> str:
                 <div class="tools-section" id="tools-coordinator"></div>
                 <div class="think-section">
                     <div class="think-hdr">💭 Thinking</div>
-                    <div class="think-content" id="think-coordinator"></div>
+                    <div class="think-content" id="think-coordinator"><span class="think-text"></span></div>
                 </div>
             </div>
             
@@ -555,7 +1094,7 @@ def get_embedded_html() -> str:
                 <div class="tools-section" id="tools-bug_agent"></div>
                 <div class="think-section">
                     <div class="think-hdr">💭 Thinking</div>
-                    <div class="think-content" id="think-bug_agent"></div>
+                    <div class="think-content" id="think-bug_agent"><span class="think-text"></span></div>
                 </div>
             </div>
             
@@ -574,7 +1113,7 @@ def get_embedded_html() -> str:
                 <div class="tools-section" id="tools-security_agent"></div>
                 <div class="think-section">
                     <div class="think-hdr">💭 Thinking</div>
-                    <div class="think-content" id="think-security_agent"></div>
+                    <div class="think-content" id="think-security_agent"><span class="think-text"></span></div>
                 </div>
             </div>
         </div>
@@ -600,39 +1139,302 @@ def get_embedded_html() -> str:
         </div>
     </div>
     
+    <!-- Card skeletons, cloned per card and filled with textContent -->
+    <template id="tool-card-tpl">
+        <div class="tool-card">
+            <div class="tool-row1">
+                <span class="tool-name"></span>
+                <span class="tool-meta">
+                    <span class="tool-time">⏱️ running...</span>
+                    <span class="tool-stat wait">Pending</span>
+                </span>
+            </div>
+            <div class="tool-io">
+                <div class="tool-io-box">
+                    <div class="tool-io-label">📥 INPUT</div>
+                    <div class="tool-io-content input"></div>
+                </div>
+                <div class="tool-io-box">
+                    <div class="tool-io-label">📤 OUTPUT</div>
+                    <div class="tool-io-content output">Waiting...</div>
+                </div>
+            </div>
+        </div>
+    </template>
+    <template id="plan-item-tpl">
+        <div class="plan-item"><span><span class="check"></span><span class="plan-desc"></span></span><span class="plan-badge"></span></div>
+    </template>
+    <template id="finding-card-tpl">
+        <div class="finding-card">
+            <div class="find-row1">
+                <span class="find-title"></span>
+                <span class="find-sev"></span>
+            </div>
+            <div class="find-meta"></div>
+            <div class="find-desc"></div>
+            <div class="find-code"></div>
+            <div class="find-fix">
+                <div class="find-fix-hdr">✅ SUGGESTED FIX</div>
+                <div class="find-fix-code"></div>
+            </div>
+        </div>
+    </template>
+    
+    <!-- WebSocket worker: owns the socket, decodes and parses frames, and
+         posts arrays of messages to the page. Not executed in place. -->
+    <script type="text/js-worker" id="ws-worker-src">
+        const utf8 = new TextDecoder();
+        let ws = null, url = null;
+        
+        function connect() {
+            ws = new WebSocket(url);
+            ws.binaryType = 'arraybuffer';
+            ws.onopen = () => postMessage({ kind: 'open' });
+            ws.onclose = () => {
+                postMessage({ kind: 'close' });
+                setTimeout(connect, 2000);
+            };
+            ws.onmessage = (e) => {
+                try {
+                    const parsed = JSON.parse(typeof e.data === 'string' ? e.data : utf8.decode(e.data));
+                    postMessage({ kind: 'events', events: Array.isArray(parsed) ? parsed : [parsed] });
+                } catch (err) { console.error(err); }
+            };
+        }
+        
+        onmessage = (e) => {
+            if (e.data.kind === 'connect') {
+                url = e.data.url;
+                connect();
+            } else if (e.data.kind === 'send' && ws && ws.readyState === WebSocket.OPEN) {
+                ws.send(e.data.text);
+            }
+        };
+    </script>
+    
     <script>
-        let ws = null, isConnected = false;
+        let ws = null, worker = null, isConnected = false;
         let totalFindings = 0, totalFixes = 0;
         const sevCounts = { critical: 0, high: 0, medium: 0, low: 0 };
         const toolData = {};
         const agentToolCounts = { coordinator: 0, bug_agent: 0, security_agent: 0 };
         
+        // Element lookups resolved once; handlers run per streamed event
+        const $ = (id) => document.getElementById(id);
+        const agentEls = {};
+        for (const a of Object.keys(agentToolCounts)) {
+            agentEls[a] = {
+                status: $('status-' + a), task: $('task-' + a), cur: $('cur-' + a),
+                cnt: $('cnt-' + a), retry: $('retry-' + a), tools: $('tools-' + a), think: $('think-' + a),
+            };
+        }
+        const metricEls = { total: $('mTotal'), crit: $('mCrit'), high: $('mHigh'), fixes: $('mFixes') };
+        const sevEls = { critical: $('fc'), high: $('fh'), medium: $('fm'), low: $('fl') };
+        const connStatus = $('connStatus'), analyzeBtn = $('analyzeBtn');
+        const findingsList = $('findingsList'), planList = $('planList'), planInfo = $('planInfo');
+        const codeInput = $('codeInput'), noFindings = $('noFindings');
+        const planEmpty = planList.firstElementChild;
+        const PLAN_ICONS = { __proto__: null, security: '🔒', bug: '🐛' };
+        // step_id -> { row, check }, rebuilt by showPlan
+        const planEls = new Map();
+        // finding_id -> { box, code }: the card's hidden fix section
+        const fixEls = new Map();
+        const toolCardTpl = $('tool-card-tpl').content.firstElementChild;
+        const findingCardTpl = $('finding-card-tpl').content.firstElementChild;
+        const planItemTpl = $('plan-item-tpl').content.firstElementChild;
+        // Where each filled-in node sits inside a card, resolved once from
+        // the template; a fresh clone is then walked, not queried.
+        const toolSlots = slotPaths(toolCardTpl, {
+            name: '.tool-name', input: '.tool-io-content.input', output: '.tool-io-content.output',
+            time: '.tool-time', stat: '.tool-stat',
+        });
+        const findingSlots = slotPaths(findingCardTpl, {
+            title: '.find-title', sev: '.find-sev', meta: '.find-meta', desc: '.find-desc',
+            code: '.find-code', fix: '.find-fix', fixCode: '.find-fix-code',
+        });
+        const utf8 = new TextDecoder();
+        // Messages are queued and rendered once per animation frame, so a
+        // burst costs one layout instead of one per message.
+        const pending = [];
+        let flushScheduled = false;
+        // Finding cards created during a flush, inserted together at its end
+        let findingsFrag = null;
+        // Containers to pin to the bottom; scrolled once, after all writes
+        const scrollPending = new Set();
+        // Counter element -> latest text; a burst of findings or tool calls
+        // rewrites each counter once, at the end of the flush
+        const counterWrites = new Map();
+        // Follow mode: each auto-scrolled container ends in a zero-height
+        // tail; an IntersectionObserver tracks whether it is on screen, and
+        // only containers whose tail is visible get pinned to the bottom.
+        const scrollTails = new Map();
+        const tailObserver = window.IntersectionObserver ? new IntersectionObserver((entries) => {
+            for (const e of entries) scrollTails.get(e.target.parentNode).follow = e.isIntersecting;
+        }) : null;
+        
+        function addScrollTail(container) {
+            const tail = document.createElement('div');
+            tail.className = 'scroll-tail';
+            container.appendChild(tail);
+            scrollTails.set(container, { tail, follow: true });
+            if (tailObserver) tailObserver.observe(tail);
+        }
+        
+        for (const ui of Object.values(agentEls)) {
+            // One text node per pane; appendData grows it without copying
+            // the accumulated text on every chunk.
+            ui.thinkNode = ui.think.firstElementChild.appendChild(document.createTextNode(''));
+            addScrollTail(ui.think);
+        }
+        addScrollTail(findingsList);
+        
         function connect() {
             const proto = location.protocol === 'https:' ? 'wss:' : 'ws:';
-            ws = new WebSocket(proto + '//' + location.host + '/ws/review');
-            ws.onopen = () => {
-                isConnected = true;
-                document.getElementById('connStatus').textContent = 'Connected';
-                document.getElementById('connStatus').className = 'conn conn-on';
-            };
+            const url = proto + '//' + location.host + '/ws/review';
+            // Socket reads and JSON parsing run in a worker when possible,
+            // leaving the main thread to render.
+            if (window.Worker) {
+                try {
+                    const src = $('ws-worker-src').textContent;
+                    worker = new Worker(URL.createObjectURL(new Blob([src], { type: 'text/javascript' })));
+                    worker.onmessage = (e) => {
+                        if (e.data.kind === 'events') enqueue(e.data.events);
+                        else setConnected(e.data.kind === 'open');
+                    };
+                    worker.onerror = (e) => {
+                        console.error('Worker error:', e);
+                        if (!isConnected) fallBackToMainThread(url);
+                    };
+                    worker.postMessage({ kind: 'connect', url });
+                    return;
+                } catch (err) {
+                    worker = null;
+                }
+            }
+            connectDirect(url);
+        }
+        
+        function fallBackToMainThread(url) {
+            if (!worker) return;
+            worker.terminate();
+            worker = null;
+            connectDirect(url);
+        }
+        
+        function connectDirect(url) {
+            ws = new WebSocket(url);
+            ws.binaryType = 'arraybuffer';
+            ws.onopen = () => setConnected(true);
             ws.onclose = () => {
-                isConnected = false;
-                document.getElementById('connStatus').textContent = 'Disconnected';
-                document.getElementById('connStatus').className = 'conn conn-off';
-                setTimeout(connect, 2000);
+                setConnected(false);
+                setTimeout(() => connectDirect(url), 2000);
             };
             ws.onerror = (e) => console.error('WS error:', e);
-            ws.onmessage = (e) => { try { handleEvent(JSON.parse(e.data)); } catch(err) { console.error(err); } };
+            ws.onmessage = (e) => {
+                try {
+                    const text = typeof e.data === 'string' ? e.data : utf8.decode(e.data);
+                    const parsed = JSON.parse(text);
+                    // Bus events arrive batched as arrays; replies are single objects
+                    enqueue(Array.isArray(parsed) ? parsed : [parsed]);
+                } catch(err) { console.error(err); }
+            };
+        }
+        
+        function send(msg) {
+            const text = JSON.stringify(msg);
+            if (worker) worker.postMessage({ kind: 'send', text });
+            else ws.send(text);
+        }
+        
+        function setConnected(on) {
+            isConnected = on;
+            connStatus.textContent = on ? 'Connected' : 'Disconnected';
+            connStatus.className = 'conn ' + (on ? 'conn-on' : 'conn-off');
+        }
+        
+        function enqueue(msgs) {
+            // rAF does not run in a hidden tab, so messages pile up until it
+            // is shown again; compact them meanwhile so the catch-up frame
+            // only does the work whose result is still visible.
+            const hidden = document.hidden;
+            for (const m of msgs) {
+                if (!(hidden && absorbHidden(m))) pending.push(m);
+            }
+            if (!flushScheduled) {
+                flushScheduled = true;
+                requestAnimationFrame(flushEvents);
+            }
         }
         
-        document.getElementById('analyzeBtn').onclick = () => {
-            const code = document.getElementById('codeInput').value;
+        function absorbHidden(msg) {
+            const data = msg.data;
+            if (!data) return false;
+            if (msg.event_type === 'thinking' && data.chunk) {
+                const last = pending[pending.length - 1];
+                if (last && last.event_type === 'thinking' && last.agent_id === msg.agent_id && last.data && last.data.chunk) {
+                    last.data.chunk += data.chunk;
+                    return true;
+                }
+            } else if (msg.event_type === 'plan_step_completed') {
+                // A started step that already completed never needs showing
+                for (let i = pending.length - 1; i >= 0; --i) {
+                    const p = pending[i];
+                    if (p.event_type === 'plan_step_started' && p.data && p.data.step_id === data.step_id) {
+                        pending.splice(i, 1);
+                        break;
+                    }
+                }
+            }
+            return false;
+        }
+        
+        function flushEvents() {
+            flushScheduled = false;
+            const batch = pending.splice(0);
+            // Consecutive thinking chunks from one agent become a single append
+            let thinkAgent = null, thinkChunks = [];
+            for (const msg of batch) {
+                const agent = msg.agent_id || 'coordinator';
+                if (msg.event_type === 'thinking' && msg.data && msg.data.chunk) {
+                    if (agent !== thinkAgent) {
+                        flushThink(thinkAgent, thinkChunks);
+                        thinkAgent = agent;
+                        thinkChunks = [];
+                    }
+                    thinkChunks.push(msg.data.chunk);
+                    continue;
+                }
+                flushThink(thinkAgent, thinkChunks);
+                thinkAgent = null;
+                thinkChunks = [];
+                try { handleEvent(msg); } catch(err) { console.error(err); }
+            }
+            flushThink(thinkAgent, thinkChunks);
+            commitFindings();
+            for (const [el, text] of counterWrites) el.textContent = text;
+            counterWrites.clear();
+            // Scroll the container itself; scrollIntoView would also scroll
+            // the page to whichever pane is streaming
+            for (const el of scrollPending) {
+                if (scrollTails.get(el).follow) el.scrollTop = el.scrollHeight;
+            }
+            scrollPending.clear();
+        }
+        
+        function flushThink(agent, chunks) {
+            if (!chunks.length) return;
+            setStatus(agent, 'thinking', 'Thinking...');
+            appendThink(agent, chunks.join(''));
+        }
+        
+        analyzeBtn.onclick = () => {
+            const code = codeInput.value;
             if (!code.trim()) return alert('Please enter code to analyze');
             if (!isConnected) return alert('Not connected to server');
             resetUI();
-            ws.send(JSON.stringify({ type: 'start_review', code, filename: 'code.py' }));
-            document.getElementById('analyzeBtn').disabled = true;
-            document.getElementById('analyzeBtn').textContent = '⏳ Analyzing...';
+            send({ type: 'start_review', code, filename: 'code.py' });
+            analyzeBtn.disabled = true;
+            analyzeBtn.textContent = '⏳ Analyzing...';
         };
         
         function resetUI() {
@@ -641,163 +1443,204 @@ def get_embedded_html() -> str:
             agentToolCounts.coordinator = agentToolCounts.bug_agent = agentToolCounts.security_agent = 0;
             Object.keys(toolData).forEach(k => delete toolData[k]);
             
-            document.getElementById('mTotal').textContent = '0';
-            document.getElementById('mCrit').textContent = '0';
-            document.getElementById('mHigh').textContent = '0';
-            document.getElementById('mFixes').textContent = '0';
-            document.getElementById('fc').textContent = '0';
-            document.getElementById('fh').textContent = '0';
-            document.getElementById('fm').textContent = '0';
-            document.getElementById('fl').textContent = '0';
+            counterWrites.clear();
+            for (const el of Object.values(metricEls)) el.textContent = '0';
+            for (const el of Object.values(sevEls)) el.textContent = '0';
             
-            document.getElementById('findingsList').innerHTML = '<div class="no-data" id="noFindings">Findings will stream here as agents discover issues...</div>';
-            document.getElementById('planList').innerHTML = '<div class="no-data">Plan will appear here after analysis starts...</div>';
-            document.getElementById('planInfo').textContent = 'Waiting...';
+            findingsFrag = null;
+            noFindings.style.display = '';
+            findingsList.replaceChildren(noFindings, scrollTails.get(findingsList).tail);
+            planEls.clear();
+            fixEls.clear();
+            planList.replaceChildren(planEmpty);
+            planInfo.textContent = 'Waiting...';
             
-            ['security_agent', 'bug_agent', 'coordinator'].forEach(a => {
-                document.getElementById('tools-' + a).innerHTML = '';
-                document.getElementById('think-' + a).textContent = '';
-                document.getElementById('cur-' + a).textContent = '-';
-                document.getElementById('cnt-' + a).textContent = '(0 calls)';
-                document.getElementById('retry-' + a).style.display = 'none';
+            if (cardObserver) cardObserver.disconnect();
+            for (const [a, ui] of Object.entries(agentEls)) {
+                ui.tools.replaceChildren();
+                ui.thinkNode.data = '';
+                ui.cur.textContent = '-';
+                ui.cnt.textContent = '(0 calls)';
+                ui.retry.style.display = 'none';
                 setStatus(a, 'idle', 'Waiting...');
-            });
+            }
         }
         
         function setStatus(agent, status, task) {
-            const el = document.getElementById('status-' + agent);
-            const tk = document.getElementById('task-' + agent);
-            if (el) {
-                el.textContent = status.charAt(0).toUpperCase() + status.slice(1);
-                el.className = 'agent-badge st-' + status;
+            const ui = agentEls[agent];
+            if (!ui) return;
+            // Streams repeat the same status many times a second; only
+            // touch the DOM when the badge or task text actually changes.
+            if (ui.shownStatus !== status) {
+                ui.shownStatus = status;
+                ui.status.textContent = status.charAt(0).toUpperCase() + status.slice(1);
+                ui.status.className = 'agent-badge st-' + status;
+            }
+            if (task && ui.shownTask !== task) {
+                ui.shownTask = task;
+                ui.task.textContent = task;
             }
-            if (tk && task) tk.textContent = task;
         }
         
-        function handleEvent(msg) {
-            if (['review_accepted', 'keepalive', 'pong'].includes(msg.type)) return;
-            const evt = msg.event_type || msg.type;
-            const data = msg.data || msg;
-            const agent = msg.agent_id || 'coordinator';
-            
-            switch (evt) {
-                case 'agent_started':
-                    setStatus(agent, 'running', data.task || 'Starting...');
-                    break;
-                    
-                case 'agent_completed':
-                    setStatus(agent, data.success !== false ? 'completed' : 'error', data.summary || 'Done');
-                    document.getElementById('cur-' + agent).textContent = data.success !== false ? '✓ Done' : '✗ Failed';
-                    document.getElementById('retry-' + agent).style.display = 'none';
-                    if (agent === 'coordinator') {
-                        document.getElementById('analyzeBtn').disabled = false;
-                        document.getElementById('analyzeBtn').textContent = '🚀 Analyze Code';
-                    }
-                    break;
-                    
-                case 'agent_error':
-                    if (data.will_retry) {
-                        setStatus(agent, 'retrying', 'Retry ' + data.attempt + '/' + data.max_attempts);
-                        const rt = document.getElementById('retry-' + agent);
-                        rt.textContent = 'Retry ' + data.attempt + '/' + data.max_attempts;
-                        rt.style.display = 'inline';
-                    } else {
-                        setStatus(agent, 'error', 'Failed after ' + data.attempt + ' attempts');
-                        document.getElementById('cur-' + agent).textContent = '✗ Max retries reached';
-                    }
-                    break;
-                    
-                case 'thinking':
-                    if (data.chunk) {
-                        setStatus(agent, 'thinking', 'Thinking...');
-                        appendThink(agent, data.chunk);
-                    }
-                    break;
-                    
-                case 'mode_changed':
-                    if (data.mode === 'thinking') {
-                        setStatus(agent, 'thinking', 'Thinking...');
+        // One handler per event type, looked up directly instead of walking
+        // a string switch; types without an entry (review_accepted,
+        // keepalive, pong, thinking_complete, ...) are ignored.
+        const eventHandlers = {
+            __proto__: null,
+            review_rejected(agent, data) {
+                analyzeBtn.disabled = false;
+                analyzeBtn.textContent = '🚀 Analyze Code';
+                alert(data.error || 'Server busy');
+            },
+            agent_started(agent, data) {
+                setStatus(agent, 'running', data.task || 'Starting...');
+            },
+            agent_completed(agent, data) {
+                const ok = data.success !== false;
+                setStatus(agent, ok ? 'completed' : 'error', data.summary || 'Done');
+                const ui = agentEls[agent];
+                if (ui) {
+                    ui.cur.textContent = ok ? '✓ Done' : '✗ Failed';
+                    ui.retry.style.display = 'none';
+                    setThinkStreaming(ui, false);
+                }
+                if (agent === 'coordinator') {
+                    analyzeBtn.disabled = false;
+                    analyzeBtn.textContent = '🚀 Analyze Code';
+                }
+            },
+            agent_error(agent, data) {
+                const ui = agentEls[agent];
+                if (data.will_retry) {
+                    setStatus(agent, 'retrying', 'Retry ' + data.attempt + '/' + data.max_attempts);
+                    if (ui) {
+                        ui.retry.textContent = 'Retry ' + data.attempt + '/' + data.max_attempts;
+                        ui.retry.style.display = 'inline';
                     }
-                    break;
-                    
-                case 'thinking_complete':
-                    break;
-                    
-                case 'tool_call_start':
-                    setStatus(agent, 'running', data.tool_name);
-                    addToolCard(agent, data);
-                    break;
-                    
-                case 'tool_call_result':
-                    updateToolCard(data);
-                    break;
-                    
-                case 'finding_discovered':
-                    addFinding(data);
-                    break;
-                    
-                case 'fix_proposed':
-                    updateFix(data);
-                    break;
-                    
-                case 'plan_created':
-                    showPlan(data.steps);
-                    break;
-                    
-                case 'plan_step_started':
-                    updatePlan(data.step_id, 'running');
-                    break;
-                    
-                case 'plan_step_completed':
-                    updatePlan(data.step_id, 'completed');
-                    break;
-            }
+                } else {
+                    setStatus(agent, 'error', 'Failed after ' + data.attempt + ' attempts');
+                    if (ui) ui.cur.textContent = '✗ Max retries reached';
+                }
+            },
+            thinking(agent, data) {
+                if (data.chunk) {
+                    setStatus(agent, 'thinking', 'Thinking...');
+                    appendThink(agent, data.chunk);
+                }
+            },
+            thinking_complete(agent, data) {
+                const ui = agentEls[agent];
+                if (ui) setThinkStreaming(ui, false);
+            },
+            mode_changed(agent, data) {
+                if (data.mode === 'thinking') setStatus(agent, 'thinking', 'Thinking...');
+            },
+            tool_call_start(agent, data) {
+                setStatus(agent, 'running', data.tool_name);
+                addToolCard(agent, data);
+            },
+            tool_call_result(agent, data) { updateToolCard(data); },
+            finding_discovered(agent, data) { addFinding(data); },
+            fix_proposed(agent, data) { updateFix(data); },
+            plan_created(agent, data) { showPlan(data.steps); },
+            plan_step_started(agent, data) { updatePlan(data.step_id, 'running'); },
+            plan_step_completed(agent, data) { updatePlan(data.step_id, data.success === false ? 'failed' : 'completed'); },
+        };
+        
+        function handleEvent(msg) {
+            const handler = eventHandlers[msg.event_type || msg.type];
+            if (handler) handler(msg.agent_id || 'coordinator', msg.data || msg);
         }
         
         function appendThink(agent, text) {
-            const el = document.getElementById('think-' + agent);
-            if (el) {
-                el.textContent += text;
-                el.scrollTop = el.scrollHeight;
+            const ui = agentEls[agent];
+            if (ui) {
+                ui.thinkNode.appendData(text);
+                setThinkStreaming(ui, true);
+                scrollPending.add(ui.think);
+            }
+        }
+        
+        function setThinkStreaming(ui, on) {
+            if (ui.streaming === on) return;
+            ui.streaming = on;
+            ui.think.classList.toggle('streaming', on);
+        }
+        
+        function slotPaths(tpl, selectors) {
+            // selector -> element-child indexes leading to it from tpl
+            const paths = {};
+            for (const key in selectors) {
+                const path = [];
+                for (let el = tpl.querySelector(selectors[key]); el !== tpl; el = el.parentElement) {
+                    path.unshift(Array.prototype.indexOf.call(el.parentElement.children, el));
+                }
+                paths[key] = path;
             }
+            return paths;
+        }
+        
+        function slot(root, path) {
+            let el = root;
+            for (let i = 0; i < path.length; ++i) el = el.children[path[i]];
+            return el;
         }
         
         function addToolCard(agent, data) {
+            const ui = agentEls[agent];
+            if (!ui) return;
             agentToolCounts[agent]++;
-            document.getElementById('cnt-' + agent).textContent = '(' + agentToolCounts[agent] + ' calls)';
+            counterWrites.set(ui.cnt, '(' + agentToolCounts[agent] + ' calls)');
             
             const id = data.tool_call_id;
-            toolData[id] = { agent, start: Date.now(), name: data.tool_name };
+            const start = Date.now();
             
-            document.getElementById('cur-' + agent).textContent = data.tool_name + ' ⏱️';
+            ui.cur.textContent = data.tool_name + ' ⏱️';
             
-            const list = document.getElementById('tools-' + agent);
-            const div = document.createElement('div');
-            div.className = 'tool-card';
+            const list = ui.tools;
+            const div = toolCardTpl.cloneNode(true);
             div.id = 'tc-' + id;
             
-            const inputStr = JSON.stringify(data.input || {}, null, 2);
-            
-            div.innerHTML = 
-                '<div class="tool-row1">' +
-                    '<span class="tool-name">' + esc(data.tool_name) + '</span>' +
-                    '<span class="tool-meta">' +
-                        '<span class="tool-time" id="tt-' + id + '">⏱️ running...</span>' +
-                        '<span class="tool-stat wait" id="ts-' + id + '">Pending</span>' +
-                    '</span>' +
-                '</div>' +
-                '<div class="tool-io">' +
-                    '<div class="tool-io-box">' +
-                        '<div class="tool-io-label">📥 INPUT</div>' +
-                        '<div class="tool-io-content input">' + esc(inputStr) + '</div>' +
-                    '</div>' +
-                    '<div class="tool-io-box">' +
-                        '<div class="tool-io-label">📤 OUTPUT</div>' +
-                        '<div class="tool-io-content output" id="to-' + id + '">Waiting...</div>' +
-                    '</div>' +
-                '</div>';
+            slot(div, toolSlots.name).textContent = String(data.tool_name || '');
+            const inEl = slot(div, toolSlots.input);
+            const outEl = slot(div, toolSlots.output);
+            div._ioEls = [inEl, outEl];
+            div._visible = false;
             
             list.insertBefore(div, list.firstChild);
+            if (cardObserver) cardObserver.observe(div);
+            setCardIO(div, inEl, data.input || {});
+            // Keep the nodes the result will update alongside the call data
+            toolData[id] = {
+                agent, start, name: data.tool_name, card: div, outEl,
+                timeEl: slot(div, toolSlots.time),
+                statEl: slot(div, toolSlots.stat),
+                curEl: ui.cur,
+            };
+        }
+        
+        // Tool input/output is pretty-printed only once its card is on
+        // screen; cards that never scroll into view keep the raw value.
+        const cardObserver = window.IntersectionObserver ? new IntersectionObserver((entries) => {
+            for (const e of entries) {
+                e.target._visible = e.isIntersecting;
+                if (e.isIntersecting) renderCardIO(e.target);
+            }
+        }) : null;
+        
+        function setCardIO(card, el, value) {
+            el._raw = value;
+            el._stale = true;
+            if (!cardObserver || card._visible) renderCardIO(card);
+        }
+        
+        function renderCardIO(card) {
+            for (const el of card._ioEls) {
+                if (!el._stale) continue;
+                el._stale = false;
+                const v = el._raw;
+                el.textContent = typeof v === 'object' ? JSON.stringify(v, null, 2) : String(v || '(empty)');
+            }
         }
         
         function updateToolCard(data) {
@@ -808,120 +1651,116 @@ def get_embedded_html() -> str:
             const dur = data.duration_ms || (Date.now() - td.start);
             const ok = data.success;
             
-            const tt = document.getElementById('tt-' + id);
-            if (tt) tt.textContent = dur + 'ms';
-            
-            const ts = document.getElementById('ts-' + id);
-            if (ts) {
-                ts.textContent = ok ? 'Success' : 'Error';
-                ts.className = 'tool-stat ' + (ok ? 'ok' : 'err');
-            }
+            td.timeEl.textContent = dur + 'ms';
+            td.statEl.textContent = ok ? 'Success' : 'Error';
+            td.statEl.classList.remove('wait');
+            td.statEl.classList.add(ok ? 'ok' : 'err');
             
-            const to = document.getElementById('to-' + id);
-            if (to) {
-                let out = data.error || data.output;
-                let outStr = typeof out === 'object' ? JSON.stringify(out, null, 2) : String(out || '(empty)');
-                to.textContent = outStr;
-            }
+            setCardIO(td.card, td.outEl, data.error || data.output);
             
-            document.getElementById('cur-' + td.agent).textContent = td.name + ' ' + dur + 'ms ' + (ok ? '✓' : '✗');
+            td.curEl.textContent = td.name + ' ' + dur + 'ms ' + (ok ? '✓' : '✗');
         }
         
         function addFinding(f) {
-            document.getElementById('noFindings').style.display = 'none';
+            if (totalFindings === 0) noFindings.style.display = 'none';
             
             totalFindings++;
             const sev = (f.severity || 'medium').toLowerCase();
             const fid = f.finding_id || ('f' + totalFindings);
             
-            sevCounts[sev]++;
-            document.getElementById('fc').textContent = sevCounts.critical;
-            document.getElementById('fh').textContent = sevCounts.high;
-            document.getElementById('fm').textContent = sevCounts.medium;
-            document.getElementById('fl').textContent = sevCounts.low;
-            document.getElementById('mTotal').textContent = totalFindings;
-            if (sev === 'critical') document.getElementById('mCrit').textContent = sevCounts.critical;
-            if (sev === 'high') document.getElementById('mHigh').textContent = sevCounts.high;
+            // Only the counters this severity moves are rewritten
+            if (sev in sevCounts) {
+                counterWrites.set(sevEls[sev], ++sevCounts[sev]);
+                if (sev === 'critical') counterWrites.set(metricEls.crit, sevCounts.critical);
+                if (sev === 'high') counterWrites.set(metricEls.high, sevCounts.high);
+            }
+            counterWrites.set(metricEls.total, totalFindings);
             
-            const list = document.getElementById('findingsList');
-            const div = document.createElement('div');
-            div.className = 'finding-card ' + sev;
+            const div = findingCardTpl.cloneNode(true);
+            div.classList.add(sev);
             div.id = 'find-' + fid;
             
             const line = f.location ? f.location.line_start : '?';
             const snippet = f.location ? (f.location.code_snippet || '') : '';
             
-            div.innerHTML = 
-                '<div class="find-row1">' +
-                    '<span class="find-title">' + esc(f.title || 'Finding') + '</span>' +
-                    '<span class="find-sev sev-' + sev + '">' + sev.toUpperCase() + '</span>' +
-                '</div>' +
-                '<div class="find-meta">' + esc(f.category || 'Unknown') + ' • Line ' + line + '</div>' +
-                '<div class="find-desc">' + esc(f.description || 'No description') + '</div>' +
-                (snippet ? '<div class="find-code">' + esc(snippet) + '</div>' : '') +
-                '<div class="find-fix" id="fix-' + fid + '">' +
-                    '<div class="find-fix-hdr">✅ SUGGESTED FIX</div>' +
-                    '<div class="find-fix-code"></div>' +
-                '</div>';
+            // Resolve every slot before the code block may be removed
+            const fixBox = slot(div, findingSlots.fix);
+            fixEls.set(fid, { box: fixBox, code: slot(div, findingSlots.fixCode) });
+            slot(div, findingSlots.title).textContent = f.title || 'Finding';
+            const sevEl = slot(div, findingSlots.sev);
+            sevEl.classList.add('sev-' + sev);
+            sevEl.textContent = sev.toUpperCase();
+            slot(div, findingSlots.meta).textContent = (f.category || 'Unknown') + ' • Line ' + line;
+            slot(div, findingSlots.desc).textContent = f.description || 'No description';
+            const codeEl = slot(div, findingSlots.code);
+            if (snippet) codeEl.textContent = snippet;
+            else codeEl.remove();
             
-            list.appendChild(div);
-            list.scrollTop = list.scrollHeight;
+            if (!findingsFrag) findingsFrag = document.createDocumentFragment();
+            findingsFrag.appendChild(div);
+        }
+        
+        function commitFindings() {
+            if (!findingsFrag) return;
+            findingsList.insertBefore(findingsFrag, scrollTails.get(findingsList).tail);
+            findingsFrag = null;
+            scrollPending.add(findingsList);
         }
         
         function updateFix(data) {
-            const fid = data.finding_id;
-            const el = document.getElementById('fix-' + fid);
-            if (el) {
-                el.classList.add('show');
-                const code = el.querySelector('.find-fix-code');
-                if (code) code.textContent = data.proposed_code || data.explanation || 'See documentation';
+            // Works whether the card is on the page or still in findingsFrag
+            const fix = fixEls.get(data.finding_id);
+            if (fix) {
+                fix.box.classList.add('show');
+                fix.code.textContent = data.proposed_code || data.explanation || 'See documentation';
                 totalFixes++;
-                document.getElementById('mFixes').textContent = totalFixes;
+                counterWrites.set(metricEls.fixes, totalFixes);
             }
         }
         
         function showPlan(steps) {
-            const list = document.getElementById('planList');
-            list.innerHTML = '';
-            document.getElementById('planInfo').textContent = steps.length + ' steps';
+            planEls.clear();
+            planInfo.textContent = steps.length + ' steps';
             
-            steps.forEach((s, i) => {
-                const div = document.createElement('div');
-                div.className = 'plan-item';
-                div.id = 'plan-' + s.step_id;
-                const icon = s.agent === 'security' ? '🔒' : s.agent === 'bug' ? '🐛' : '🎯';
-                div.innerHTML = 
-                    '<span><span class="check" id="check-' + s.step_id + '"></span>' + (i + 1) + '. ' + esc(s.description) + '</span>' +
-                    '<span class="plan-badge">' + icon + ' ' + s.agent + '</span>';
-                list.appendChild(div);
-            });
-        }
-        
-        function updatePlan(id, status) {
-            const el = document.getElementById('plan-' + id);
-            const check = document.getElementById('check-' + id);
-            if (el) {
-                el.className = 'plan-item ' + status;
-                if (status === 'completed' && check) {
-                    check.textContent = '✓ ';
-                }
+            const frag = document.createDocumentFragment();
+            for (let i = 0, n = steps.length; i < n; ++i) {
+                const s = steps[i];
+                const div = planItemTpl.cloneNode(true);
+                const icon = PLAN_ICONS[s.agent] || '🎯';
+                const check = div.firstChild.firstChild;
+                check.nextSibling.textContent = (i + 1) + '. ' + String(s.description || '');
+                div.lastChild.textContent = icon + ' ' + s.agent;
+                planEls.set(s.step_id, { row: div, check });
+                frag.appendChild(div);
             }
+            // Old rows out, new rows in, as one mutation
+            planList.replaceChildren(frag);
         }
         
-        function esc(t) {
-            const d = document.createElement('div');
-            d.textContent = String(t || '');
-            return d.innerHTML;
+        function updatePlan(id, status) {
+            const step = planEls.get(id);
+            // Steps report each state once, but retries can repeat them
+            if (!step || step.row._status === status) return;
+            const el = step.row;
+            if (el._status) el.classList.remove(el._status);
+            el.classList.add(status);
+            el._status = status;
+            if (status === 'completed') step.check.textContent = '✓ ';
+            else if (status === 'failed') step.check.textContent = '✗ ';
         }
         
         connect();
         
-        document.getElementById('codeInput').value = "import sqlite3\\nimport hashlib\\nimport os\\nimport pickle\\n\\ndef authenticate(username, password):\\n    conn = sqlite3.connect('users.db')\\n    query = f\\"SELECT * FROM users WHERE username = '{username}'\\"\\n    cursor = conn.execute(query)\\n    user = cursor.fetchone()\\n    if user:\\n        if hashlib.md5(password.encode()).hexdigest() == user[2]:\\n            return user\\n    return None\\n\\ndef run_command(cmd):\\n    os.system(f\\"echo {cmd}\\")\\n\\ndef load_data(filepath):\\n    with open(filepath, 'rb') as f:\\n        return pickle.load(f)\\n\\nAPI_KEY = \\"sk-1234567890abcdef\\"\\n\\ndef get_user_profile(user_id):\\n    user = find_user(user_id)\\n    return user.name.upper()\\n";
+        codeInput.value = "import sqlite3\\nimport hashlib\\nimport os\\nimport pickle\\n\\ndef authenticate(username, password):\\n    conn = sqlite3.connect('users.db')\\n    query = f\\"SELECT * FROM users WHERE username = '{username}'\\"\\n    cursor = conn.execute(query)\\n    user = cursor.fetchone()\\n    if user:\\n        if hashlib.md5(password.encode()).hexdigest() == user[2]:\\n            return user\\n    return None\\n\\ndef run_command(cmd):\\n    os.system(f\\"echo {cmd}\\")\\n\\ndef load_data(filepath):\\n    with open(filepath, 'rb') as f:\\n        return pickle.load(f)\\n\\nAPI_KEY = \\"sk-1234567890abcdef\\"\\n\\ndef get_user_profile(user_id):\\n    user = find_user(user_id)\\n    return user.name.upper()\\n";
     </script>
 </body>
 </html>"""
 
 
+def get_embedded_html() -> str:
+    return EMBEDDED_HTML
+
+
 app = create_app()
 
 if __name__ == "__main__":
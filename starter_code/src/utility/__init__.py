@@ -6,10 +6,8 @@ from .retry_errors import (
     AgentInvalidJSONError,
     AgentMissingFieldsError,
 )
-from ..events import EventBus, create_review_started_event
 from .retry_utils import (RetryPolicy, 
                           _backoff_delay, 
-                          validate_bug_update,
                           is_retryable_by_config,
                           validate_security_update,
                           validate_bug_update,validate_coordinator_update)
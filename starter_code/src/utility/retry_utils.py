@@ -1,59 +1,71 @@
 from __future__ import annotations
 
-import time
 import asyncio
+import random
+import time
 import logging
 from dataclasses import dataclass
-from typing import Set, Dict, Any
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
 from ..events import EventBus
 from .retry_errors import AgentMissingFieldsError
-from .utility import emit_agent_completed
 from ..events.event_types import create_agent_error_event
-from typing import Any, Awaitable, Callable, Dict, Optional, Set, List
 
 logger = logging.getLogger(__name__)
 
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class RetryPolicy:
     max_attempts: int = 2
     base_delay_s: float = 0.4
     max_delay_s: float = 3.0
     jitter_s: float = 0.15  # small jitter to avoid thundering herd
+    deadline_s: Optional[float] = None  # overall budget across attempts
 
 
 def _backoff_delay(policy: RetryPolicy, attempt: int) -> float:
-    delay = policy.base_delay_s * (2 ** (attempt - 1))
+    delay = policy.base_delay_s * (1 << (attempt - 1))
     delay = min(delay, policy.max_delay_s)
-    delay = delay + (policy.jitter_s * (0.5 - (time.time() % 1)))
+    # Independent per call: wall-clock jitter lines up concurrent retries
+    delay = delay + (policy.jitter_s * (random.random() - 0.5))
     return max(0.0, delay)
 
 
 def is_retryable_by_config(err: Exception, allowlist: Set[str], denylist: Set[str]) -> bool:
-    name = err.__class__.__name__
-    if name in denylist:
-        return False
-    if allowlist and name in allowlist:
-        return True
-    return False
+    return _name_retryable_by_config(type(err).__name__, allowlist, denylist)
+
+
+def _name_retryable_by_config(name: str, allowlist: Set[str], denylist: Set[str]) -> bool:
+    return name not in denylist and name in allowlist
+
+_MISSING = object()
+
 
-def validate_security_update(update: Dict[str, Any]) -> None:
+def _list_pair_validator(findings_key: str, fixes_key: str) -> Callable[[Dict[str, Any]], None]:
     """
-    Ensures security node produced structurally usable output
-    (you can tighten/relax this contract as needed).
+    Build a validator requiring both keys to be present and hold lists.
+    
+    The key names and error messages are bound once here, so a call is
+    just two lookups and two type checks.
     """
-    if "security_findings" not in update or "security_fixes" not in update:
-        raise AgentMissingFieldsError("Missing security_findings/security_fixes")
-    if not isinstance(update["security_findings"], list) or not isinstance(update["security_fixes"], list):
-        raise AgentMissingFieldsError("security_findings/security_fixes must be lists")
+    missing = f"Missing {findings_key}/{fixes_key}"
+    not_lists = f"{findings_key}/{fixes_key} must be lists"
+    
+    def validate(update: Dict[str, Any]) -> None:
+        findings = update.get(findings_key, _MISSING)
+        fixes = update.get(fixes_key, _MISSING)
+        if findings is _MISSING or fixes is _MISSING:
+            raise AgentMissingFieldsError(missing)
+        if not isinstance(findings, list) or not isinstance(fixes, list):
+            raise AgentMissingFieldsError(not_lists)
+    
+    return validate
 
 
-def validate_bug_update(update: Dict[str, Any]) -> None:
-    if "bug_findings" not in update or "bug_fixes" not in update:
-        raise AgentMissingFieldsError("Missing bug_findings/bug_fixes")
-    if not isinstance(update["bug_findings"], list) or not isinstance(update["bug_fixes"], list):
-        raise AgentMissingFieldsError("bug_findings/bug_fixes must be lists")
+# Ensures the security/bug node produced structurally usable output
+# (you can tighten/relax this contract as needed).
+validate_security_update = _list_pair_validator("security_findings", "security_fixes")
+validate_bug_update = _list_pair_validator("bug_findings", "bug_fixes")
 
 
 def validate_coordinator_update(update: Dict[str, Any]) -> None:
@@ -62,16 +74,16 @@ def validate_coordinator_update(update: Dict[str, Any]) -> None:
     Coordinator consolidating phase typically produces final_report.
     Keep it tolerant but not silent.
     """
-    # If coordinator says planning, require plan
     phase = update.get("phase")
+    # If coordinator says planning, require plan
     if phase == "planning":
-        plan = update.get("plan", {})
+        plan = update.get("plan")
         if not isinstance(plan, dict) or not plan.get("steps"):
             raise AgentMissingFieldsError("Coordinator planning produced no plan steps")
     # If coordinator says done, it should produce final_report
-    if phase == "done" and "final_report" not in update:
+    elif phase == "done" and "final_report" not in update:
         raise AgentMissingFieldsError("Coordinator done produced no final_report")
-    
+
 
 async def run_node_with_retry(
     *,
@@ -86,13 +98,13 @@ async def run_node_with_retry(
     strip_keys: Optional[Set[str]] = None,
     is_retryable: Optional[Callable[[Exception], bool]] = None,
 ) -> Dict[str, Any]:
-    success_patch = success_patch or {}
-    failure_patch = failure_patch or {}
-    strip_keys = strip_keys or set()
+    strip_keys = strip_keys or ()
+    max_attempts = policy.max_attempts
+    deadline = None if policy.deadline_s is None else time.monotonic() + policy.deadline_s
 
     last_err: Optional[Exception] = None
 
-    for attempt in range(1, policy.max_attempts + 1):
+    for attempt in range(1, max_attempts + 1):
         try:
             update = await node_fn(state)
 
@@ -108,25 +120,28 @@ async def run_node_with_retry(
                 validate_update(update)
 
             # Ensure success patch applied last
-            update.update(success_patch)
+            if success_patch:
+                update.update(success_patch)
             return update
 
         except Exception as e:
             last_err = e
             retryable = True if is_retryable is None else bool(is_retryable(e))
 
+            delay = _backoff_delay(policy, attempt)
+            # No retry that could only start after the budget is spent
+            out_of_time = deadline is not None and time.monotonic() + delay >= deadline
+
             # Emit “error + will_retry” to UI
-            will_retry = retryable and (attempt < policy.max_attempts)
-            last_err = e
+            will_retry = retryable and (attempt < max_attempts) and not out_of_time
 
-            if (attempt >= policy.max_attempts) or (not retryable):
+            if not will_retry:
                 logger.error(f"[{agent_id}] failed: {e}", exc_info=True)
-                out = dict(failure_patch)
-                out.setdefault("errors", [])
-                out["errors"].append({"agent": agent_id, "error": str(e), "attempts": attempt})
+                out = dict(failure_patch) if failure_patch else {}
+                # New list: the caller's patch may carry its own errors list
+                out["errors"] = [*out.get("errors", ()), {"agent": agent_id, "error": str(e), "attempts": attempt}]
                 return out
 
-            delay = _backoff_delay(policy, attempt)
             await event_bus.publish(
                     create_agent_error_event(
                         agent_id=agent_id,
@@ -135,13 +150,17 @@ async def run_node_with_retry(
                         recoverable=retryable,
                         will_retry=will_retry,
                         attempt=attempt,
-                        max_attempts=policy.max_attempts,
+                        max_attempts=max_attempts,
                         delay_s = delay if will_retry else 0))
-            logger.warning(f"[{agent_id}] retry {attempt}/{policy.max_attempts} in {delay:.2f}s: {e}")
+            logger.warning(f"[{agent_id}] retry {attempt}/{max_attempts} in {delay:.2f}s: {e}")
             await asyncio.sleep(delay)
 
     # should never happen
-    return dict(failure_patch, errors=[{"agent": agent_id, "error": str(last_err)}])
+    return dict(failure_patch or {}, errors=[{"agent": agent_id, "error": str(last_err)}])
+
+_STRUCTURAL_ERRORS = frozenset({"AgentEmptyResponseError", "AgentInvalidJSONError", "AgentMissingFieldsError"})
+_BAD_REQUEST_MARKERS = ("invalid_request", "error code: 400", "input should be a valid list")
+
 
 def retry_predicate(err: Exception, allow: Set[str], deny: Set[str]) -> bool:
     """
@@ -150,27 +169,45 @@ def retry_predicate(err: Exception, allow: Set[str], deny: Set[str]) -> bool:
     - DO retry transient + output-structure issues (invalid JSON/empty/missing keys)
     - Allowlist is config-driven
     """
+    name = type(err).__name__
     # Always retry our structural output errors (unless explicitly denied)
-    if err.__class__.__name__ in {"AgentEmptyResponseError", "AgentInvalidJSONError", "AgentMissingFieldsError"}:
-        return err.__class__.__name__ not in deny
+    if name in _STRUCTURAL_ERRORS:
+        return name not in deny
 
     # If anthropic/openai SDK error objects expose status codes, block 400-type
     msg = str(err).lower()
-    if "invalid_request" in msg or "error code: 400" in msg or "input should be a valid list" in msg:
+    if any(marker in msg for marker in _BAD_REQUEST_MARKERS):
         return False
 
     # config allow/deny
-    return is_retryable_by_config(err, allow, deny)
+    return _name_retryable_by_config(name, allow, deny)
 
 
-def retry_policy_for(retry_cfg: Dict[str, Any], agent_id: str, default: RetryPolicy) -> RetryPolicy:
-    node_cfg = (retry_cfg.get(agent_id) or {})
-    return RetryPolicy(
+def retry_settings_for(
+    retry_cfg: Dict[str, Any], agent_id: str, default: RetryPolicy
+) -> tuple[RetryPolicy, frozenset[str], frozenset[str]]:
+    """
+    Resolve an agent's retry policy and allow/deny lists in one pass.
+    
+    Meant to be called once per agent when the workflow is built, not on
+    every node run.
+    """
+    node_cfg = retry_cfg.get(agent_id) or {}
+    deadline_s = node_cfg.get("deadline_s", default.deadline_s)
+    policy = RetryPolicy(
         max_attempts=int(node_cfg.get("max_attempts", default.max_attempts)),
         base_delay_s=float(node_cfg.get("base_delay_s", default.base_delay_s)),
         max_delay_s=float(node_cfg.get("max_delay_s", default.max_delay_s)),
         jitter_s=float(node_cfg.get("jitter_s", default.jitter_s)),
+        deadline_s=None if deadline_s is None else float(deadline_s),
     )
+    allow = frozenset(node_cfg.get("retry_exceptions") or ())
+    deny = frozenset(node_cfg.get("never_retry_exceptions") or ())
+    return policy, allow, deny
+
+
+def retry_policy_for(retry_cfg: Dict[str, Any], agent_id: str, default: RetryPolicy) -> RetryPolicy:
+    return retry_settings_for(retry_cfg, agent_id, default)[0]
 
 def retry_lists_for(retry_cfg: Dict[str, Any], agent_id: str) -> tuple[Set[str], Set[str]]:
     node_cfg = (retry_cfg.get(agent_id) or {})
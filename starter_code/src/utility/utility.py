@@ -1,10 +1,16 @@
+import asyncio
 import logging
+import itertools
 import json
+import re
 import uuid
 
+import orjson
+
 from typing import Dict, List, Tuple, Union, Any
-from collections import defaultdict
-from ..tools import CodeTools
+from functools import lru_cache
+from ..tools import CodeTools, ToolResult
+from ..tools.code_tools import line_span
 from ..events import (
     Event, EventBus,
     create_mode_changed_event,
@@ -28,15 +34,69 @@ from ..utility.retry_errors import AgentInvalidJSONError
 
 logger = logging.getLogger(__name__)
 
+
+# First fenced block (optionally tagged json) and the outermost {...} span
+_FENCE = re.compile(r"```(?:json)?\s*(.*?)\s*```", re.DOTALL | re.IGNORECASE)
+_JSON_OBJECT = re.compile(r"\{.*\}", re.DOTALL)
+
+
+# Proposed fixes longer than this are compiled off the event loop
+_INLINE_COMPILE_CHARS = 20_000
+
+# Fallback finding ids: one random per-process prefix plus a counter
+_ID_PREFIX = uuid.uuid4().hex[:4]
+_id_counter = itertools.count()
+
+# agent_id -> (finding category, default title, plan step agent)
+_AGENT_DEFAULTS = {
+    "bug_agent": ("bug", "Bug Detected", "bug"),
+    "security_agent": ("sec", "Security Issue", "security"),
+}
+
+
+def _unfence(text: str) -> str:
+    """Return the body of the first fenced block, or text unchanged."""
+    match = _FENCE.search(text)
+    return match.group(1) if match else text
+
+
+@lru_cache(maxsize=1024)
+def _compile_check(code: str) -> Tuple[bool, str]:
+    """Compile a proposed fix in-process; agents often re-propose the same code."""
+    try:
+        compile(code, "<fix>", "exec")
+    except (SyntaxError, ValueError) as e:
+        return False, f"SYNTAX_ERROR: {e}"
+    except (RecursionError, MemoryError) as e:
+        # Deeply nested input exhausts the compiler, not the agent
+        return False, f"SYNTAX_ERROR: too deeply nested to compile ({type(e).__name__})"
+    return True, "SYNTAX_OK"
+
+
+@lru_cache(maxsize=2048)
+def _verify_fix(original_code: str, proposed_code: str, finding_type: str) -> ToolResult:
+    """
+    Memoized CodeTools.verify_fix (pure over its inputs).
+    
+    The result is shared between identical fixes, so callers must treat it
+    as read-only.
+    """
+    return CodeTools.verify_fix(original_code, proposed_code, finding_type)
+
+
 async def emit_agent_finding_fixes(event_bus: EventBus, agent_id: str, finding: Finding, fix: Fix):
     """Emit Finding and Fixed propose event."""
-    await event_bus.publish(create_finding_discovered_event(agent_id, finding))
-    await event_bus.publish(create_fix_proposed_event(agent_id, fix))
+    await event_bus.publish_many([
+        create_finding_discovered_event(agent_id, finding),
+        create_fix_proposed_event(agent_id, fix),
+    ])
 
 async def emit_agent_started(event_bus: EventBus, agent_id: str, task: str, input_summary: str = "", mode: str=""):
     """Emit agent started event."""
-    await event_bus.publish(create_agent_started_event(agent_id=agent_id, task=task, input_summary=input_summary))
-    await event_bus.publish(create_mode_changed_event(agent_id=agent_id, mode=mode))
+    events = [create_agent_started_event(agent_id=agent_id, task=task, input_summary=input_summary)]
+    if mode:
+        events.append(create_mode_changed_event(agent_id=agent_id, mode=mode))
+    await event_bus.publish_many(events)
 
 async def emit_agent_completed(event_bus: EventBus, 
                                 agent_id: str,
@@ -48,78 +108,67 @@ async def emit_agent_completed(event_bus: EventBus,
                                 mode: str="") -> None:
     """Emit agent completed event."""
 
-    await event_bus.publish(create_agent_completed_event(
+    events = [create_agent_completed_event(
             agent_id=agent_id,
             success=success,
             findings_count=findings_count,
             fixes_proposed=fixes_proposed,
             duration_ms=duration_ms,
-            summary=summary))
-    await event_bus.publish(create_mode_changed_event(agent_id=agent_id, mode=mode))
-
-async def parse_response_to_findings(
-    event_bus: EventBus,
-    response: Union[str, Dict[str, Any]],
-    code: str,
-    filename: str,
-    agent_id: str,
-    plan_id: str
-) -> Dict[List[Finding], List[Fix]]:
-    """Parse the agent response (string OR model dict) into Finding and Fix objects."""
-    steps_map = set()
-    finding_to_fix_map = defaultdict(list)
-    # 1) Normalize to text
+            summary=summary)]
+    # An empty mode carries nothing for clients
+    if mode:
+        events.append(create_mode_changed_event(agent_id=agent_id, mode=mode))
+    await event_bus.publish_many(events)
+
+def _parse_findings_text(response: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Extract and decode the JSON object from a raw agent reply."""
+    # Normalize to text
     if isinstance(response, dict):
         text = response.get("text", "") or ""
     else:
         text = response or ""
 
-    text = text.strip()
-
-    # 2) Remove fenced code blocks if present (```json ... ```)
-    if "```" in text:
-        # keep the inside of the first fenced block if it looks like JSON
-        parts = text.split("```")
-        # parts: [before, lang+body, after, ...]
-        if len(parts) >= 2:
-            fenced = parts[1]
-            # drop optional leading 'json'
-            fenced = fenced.lstrip()
-            if fenced.lower().startswith("json"):
-                fenced = fenced[4:].lstrip()
-            # fenced ends at next fence split; parts[1] already excludes trailing ```
-            # but may include it depending on split; safe strip:
-            text = fenced.strip()
-
-    # 3) Choose default IDs/titles
-    category = ""
-    agent = "secure" if agent_id == "secure_agent" else "bug"
-    if agent_id == "bug_agent":
-        category == "bug"
-        default_title = "Bug Detected"
-    elif agent_id == "security_agent":
-        category == "sec"
-        default_title = "Security Issue"
-
-
-    # 4) Extract JSON object substring (best-effort)
+    # Keep the inside of the first fenced block if present (```json ... ```)
+    text = _unfence(text.strip())
+
+    # Extract JSON object substring (best-effort)
     json_start = text.find("{")
     json_end = text.rfind("}") + 1
     if json_start < 0 or json_end <= json_start:
         raise AgentInvalidJSONError(f"Agent: Failed to parse JSON response.") 
 
-    json_str = text[json_start:json_end]
-
     try:
-        data = json.loads(json_str)
-    except json.JSONDecodeError as e:
+        return orjson.loads(text[json_start:json_end])
+    except orjson.JSONDecodeError as e:
         logger.warning(f"Failed to parse JSON response: {e}")
         raise AgentInvalidJSONError(f"Agent: Failed to parse JSON response: {str(e)}") 
-    
-    code_lines = code.split("\n")
+
+
+async def parse_response_to_findings(
+    event_bus: EventBus,
+    response: Union[str, Dict[str, Any]],
+    code: str,
+    filename: str,
+    agent_id: str,
+    plan_id: str
+) -> Dict[str, Tuple[Finding, Fix]]:
+    """Parse the agent response (string OR model dict) into Finding and Fix objects."""
+    steps_map = set()
+    finding_to_fix_map: Dict[str, Tuple[Finding, Fix]] = {}
+    # 1) Choose default IDs/titles
+    try:
+        category, default_title, agent = _AGENT_DEFAULTS[agent_id]
+    except KeyError:
+        raise ValueError(f"No finding defaults for agent {agent_id!r}") from None
+
+    # 2) Already-structured output needs no text extraction
+    if isinstance(response, dict) and "findings" in response:
+        data = response
+    else:
+        data = _parse_findings_text(response)
 
     for item in data.get("findings", []):
-        finding_id = item.get("id", f"bug_{uuid.uuid4().hex[:8]}")
+        finding_id = item.get("id") or f"bug_{_ID_PREFIX}{next(_id_counter):04x}"
         id_step = item["type_id"].split("_")[-1]
         step_id = f"step_{id_step}"
 
@@ -127,9 +176,10 @@ async def parse_response_to_findings(
         line_end = int(item.get("line_end", line_start))
 
         snippet = item.get("code_snippet", "") or ""
-        if not snippet and 1 <= line_start <= len(code_lines):
-            snippet = "\n".join(code_lines[line_start - 1: line_end])
+        if not snippet and line_start >= 1:
+            snippet = line_span(code, line_start, line_end)
 
+        confidence = float(item.get("confidence", 0.8))
         finding = Finding(
             finding_id=finding_id,
             step_id=step_id,
@@ -145,12 +195,11 @@ async def parse_response_to_findings(
                 line_end=line_end,
                 code_snippet=snippet
             ),
-            confidence=float(item.get("confidence", 0.8)),
+            confidence=confidence,
         )
 
-        fix_data = item.get("fix", {}) or {}
+        fix_data = item.get("fix") or {}
         proposed = fix_data.get("code")
-     
 
         if proposed:
             fix = Fix(
@@ -160,7 +209,7 @@ async def parse_response_to_findings(
                 original_code=snippet,
                 proposed_code=proposed,
                 explanation=fix_data.get("explanation", ""),
-                confidence=float(item.get("confidence", 0.8)),
+                confidence=confidence,
                 auto_applicable=True,
             )
             # Verify the fix
@@ -169,11 +218,14 @@ async def parse_response_to_findings(
                                  finding=finding,
                                  fix=fix)
             
-            finding_to_fix_map[finding_id].append(finding)
-            finding_to_fix_map[finding_id].append(fix)
+            # First pair wins for a repeated id, as the callers read [0]/[1]
+            finding_to_fix_map.setdefault(finding_id, (finding, fix))
             if step_id not in steps_map:
-                await event_bus.publish(create_plan_step_started_event(plan_id, step_id, agent))
-                await event_bus.publish(create_plan_step_completed_event(plan_id, step_id, agent, True, 0))
+                steps_map.add(step_id)
+                await event_bus.publish_many([
+                    create_plan_step_started_event(plan_id, step_id, agent),
+                    create_plan_step_completed_event(plan_id, step_id, agent, True, 0),
+                ])
             await emit_agent_finding_fixes(event_bus, agent_id, finding, fix)
 
 
@@ -190,25 +242,23 @@ async def verify_fix_execute_code(
 
         finding_id = fix.finding_id
 
+        # Both checks run inline, so the events are collected and published
+        # as one batch once the verdict is known.
         # Step 1: Static analysis verification
         static_tool_id = f"verify_fix_{finding_id}"
-        await event_bus.publish(
+        static_result = _verify_fix(
+            fix.original_code,
+            fix.proposed_code,
+            finding.finding_type,
+        )
+        events = [
             create_tool_call_start_event(
                 agent_id,
                 static_tool_id,
                 "verify_fix",
                 {"issue_type": finding.finding_type},
                 "Static analysis",
-            )
-        )
-
-        static_result = CodeTools.verify_fix(
-            fix.original_code,
-            fix.proposed_code,
-            finding.finding_type,
-        )
-
-        await event_bus.publish(
+            ),
             create_tool_call_result_event(
                 "coordinator",
                 static_tool_id,
@@ -216,14 +266,19 @@ async def verify_fix_execute_code(
                 static_result.success,
                 static_result.output,
                 0,
-            )
-        )
+            ),
+        ]
 
         # Step 2: Runtime verification (syntax check)
         runtime_result = None
         if fix.proposed_code and static_result.success:
             exec_tool_id = f"execute_code_{finding_id}"
-            await event_bus.publish(
+            if len(fix.proposed_code) > _INLINE_COMPILE_CHARS:
+                ok, message = await asyncio.to_thread(_compile_check, fix.proposed_code)
+            else:
+                ok, message = _compile_check(fix.proposed_code)
+            runtime_result = ToolResult(success=ok, output=message, error=None if ok else message)
+            events.append(
                 create_tool_call_start_event(
                     "coordinator",
                     exec_tool_id,
@@ -232,18 +287,7 @@ async def verify_fix_execute_code(
                     "Runtime check",
                 )
             )
-
-            escaped_code = fix.proposed_code.replace('"""', "'''")
-            test_code = f'''
-try:
-    compile("""{escaped_code}""", "<fix>", "exec")
-    print("SYNTAX_OK")
-except SyntaxError as e:
-    print("SYNTAX_ERROR:", e)
-'''
-            runtime_result = CodeTools.execute_code(test_code, timeout=5)
-
-            await event_bus.publish(
+            events.append(
                 create_tool_call_result_event(
                     "coordinator",
                     exec_tool_id,
@@ -265,32 +309,26 @@ except SyntaxError as e:
             fix.verified = False
             fix.verification_result["runtime_error"] = runtime_result.error
 
-        await event_bus.publish(
+        events.append(
             create_fix_verified_event(
                 "coordinator",
                 fix.fix_id,
                 finding_id,
                 fix.verified,
                 "static_and_runtime",
-                json.dumps(fix.verification_result),
+                orjson.dumps(fix.verification_result).decode("utf-8"),
                 0,
             )
         )
+        await event_bus.publish_many(events)
 
         return fix, finding
 
 def parse_plan(response: str, review_id: str) -> Dict[str, Any]:
     """Parse execution plan from response."""
     try:
-        data = {}
-        import re
-        match = re.search(r'```json\s*(.*?)\s*```', response, re.DOTALL)
-        if match:
-            data = json.loads(match.group(1))
-        else:
-            match = re.search(r'\{.*\}', response, re.DOTALL)
-            if match:
-                data = json.loads(match.group(0))
+        match = _JSON_OBJECT.search(_unfence(response))
+        data = json.loads(match.group(0)) if match else {}
         
         data["plan_id"] = f"plan_{review_id}"
         return data
@@ -0,0 +1,135 @@
+"""
+Tests for the code analysis tools.
+
+Run with: pytest tests/test_code_tools.py -v
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.tools import CodeTools, TOOL_DEFINITIONS, execute_tool
+from src.tools.code_tools import line_span
+
+
+def _last_check(fixed_code: str, issue_type: str) -> dict:
+    result = CodeTools.verify_fix("original()", fixed_code, issue_type)
+    return result.output["checks"][-1]
+
+
+class TestVerifyFix:
+    """Tests for the issue-specific verify_fix heuristics."""
+
+    def test_sql_parameterized_query_passes(self):
+        check = _last_check('cur.execute("SELECT * FROM t WHERE id = ?", (uid,))', "sql_injection")
+        assert check["check"] == "parameterized_query"
+        assert check["passed"]
+
+    def test_sql_fstring_select_fails(self):
+        check = _last_check('q = f"select * from t where id = {uid}"\ncur.execute(q)', "SQL Injection")
+        assert not check["passed"]
+
+    def test_sql_without_parameters_fails(self):
+        assert not _last_check("query = build(uid)", "sql_injection")["passed"]
+
+    def test_xss_escaping_detected(self):
+        assert _last_check("return Markup.Escape(name)", "xss")["passed"]
+        assert not _last_check("return name", "xss")["passed"]
+
+    def test_null_check_detected(self):
+        assert _last_check("if user is not None:\n    return user.name", "null_reference")["passed"]
+        assert not _last_check("return user.name", "none check")["passed"]
+
+
+class TestLineLookups:
+    """Tests for tools that report source lines."""
+
+    def test_find_function_calls_reports_source_line(self):
+        code = "import os\nx = foo(1)\n\nif y:\n    foo(2)"
+        calls = CodeTools.find_function_calls(code, "foo").output["calls"]
+        assert [(c["line"], c["code"]) for c in calls] == [(2, "x = foo(1)"), (5, "foo(2)")]
+
+    def test_get_line_context_matches_split_lines(self):
+        code = "a = 1\nb = 2\nc = 3\n"
+        output = CodeTools.get_line_context(code, 2, context_lines=1).output
+        assert output["code_snippet"] == "b = 2"
+        assert output["lines"] == ["   1     a = 1", "   2 >>> b = 2", "   3     c = 3"]
+
+    def test_line_span_matches_split_lines(self):
+        for code in ("a = 1\nb = 2\nc = 3\n", "a = 1\nb = 2", ""):
+            lines = code.split("\n")
+            for start in range(1, len(lines) + 2):
+                for end in range(0, len(lines) + 2):
+                    assert line_span(code, start, end) == "\n".join(lines[start - 1:end])
+
+
+class TestExtractStrings:
+    """Tests for string literal extraction."""
+
+    def test_potential_secrets(self):
+        code = (
+            'A = "hello"\n'
+            'B = "API_TOKEN"\n'
+            'C = "' + "0123456789abcdef" * 2 + '"\n'
+            'D = "' + "QWxhZGRpbjpvcGVuIHNlc2FtZQ" * 2 + '"\n'
+        )
+        output = CodeTools.extract_strings(code).output
+        assert output["total_strings"] == 4
+        assert [s["line"] for s in output["potential_secrets"]] == [2, 3, 4]
+
+
+class TestSearchPattern:
+    """Tests for pattern search."""
+
+    def test_literal_search_is_case_insensitive_one_match_per_line(self):
+        code = "x = Eval(a)\ny = 1\nz = eval(b) + EVAL(c)"
+        matches = CodeTools.search_pattern(code, "eval(", "literal").output["matches"]
+        assert matches == [
+            {"line": 1, "content": "x = Eval(a)"},
+            {"line": 3, "content": "z = eval(b) + EVAL(c)"},
+        ]
+
+    def test_case_sensitive_search(self):
+        code = "API_KEY = 1\napi_key = 2"
+        for pattern_type in ("regex", "literal"):
+            result = CodeTools.search_pattern(code, "api_key", pattern_type, case_sensitive=True)
+            assert [m["line"] for m in result.output["matches"]] == [2]
+        result = CodeTools.search_pattern(code, "API_KEY")
+        assert [m["match"] for m in result.output["matches"]] == ["API_KEY", "api_key"]
+
+    def test_letter_free_range_still_ignores_case(self):
+        # [#-_] spans A-Z, so it matches lowercase letters only under IGNORECASE
+        result = CodeTools.search_pattern("abc", "[#-_]+")
+        assert [m["match"] for m in result.output["matches"]] == ["abc"]
+
+
+class TestExecuteCode:
+    """Tests for running code in a subprocess."""
+
+    def test_runs_as_main_with_source_in_tracebacks(self):
+        code = "print(__name__, __file__)\ndef f():\n    return 1 / 0\nf()\n"
+        result = CodeTools.execute_code(code, timeout=10)
+        assert not result.success
+        assert result.output["stdout"] == "__main__ <code>\n"
+        stderr = result.output["stderr"]
+        assert stderr.startswith('Traceback (most recent call last):\n  File "<code>", line 4')
+        assert "return 1 / 0" in stderr
+        assert stderr.rstrip().endswith("ZeroDivisionError: division by zero")
+
+    def test_exit_status_is_kept(self):
+        assert CodeTools.execute_code("import sys; sys.exit(3)", timeout=10).output["returncode"] == 3
+        assert CodeTools.execute_code("x = 1", timeout=10).success
+
+
+class TestExecuteTool:
+    """Tests for name-based tool dispatch."""
+
+    def test_every_defined_tool_is_dispatchable(self):
+        for tool in TOOL_DEFINITIONS:
+            result = execute_tool(tool["name"], {})
+            assert not result.error.startswith("Unknown tool")
+
+    def test_unknown_tool(self):
+        result = execute_tool("no_such_tool", {"code": ""})
+        assert not result.success
+        assert result.error == "Unknown tool: no_such_tool"
@@ -0,0 +1,138 @@
+"""
+Tests for EventBus streaming support.
+
+Run with: pytest tests/test_event_bus.py -v
+"""
+
+import pytest
+import asyncio
+import json
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.events import Event, EventType, EventBus, create_tool_call_result_event
+from src.events.event_types import TOOL_OUTPUT_PREVIEW_CHARS
+
+
+def _event(n: int) -> Event:
+    return Event(event_type=EventType.THINKING, agent_id="test", data={"n": n})
+
+
+class TestEventRing:
+    """Tests for the shared ring buffer read by stream endpoints."""
+
+    @pytest.mark.asyncio
+    async def test_events_since_cursor(self):
+        bus = EventBus()
+        for n in range(3):
+            await bus.publish(_event(n))
+
+        entries = bus.events_since(1)
+        assert [seq for seq, _ in entries] == [2, 3]
+        assert [e.data["n"] for _, e in entries] == [1, 2]
+        assert bus.events_since(bus.last_seq) == []
+
+    @pytest.mark.asyncio
+    async def test_ring_is_bounded(self):
+        bus = EventBus(ring_size=4)
+        for n in range(10):
+            await bus.publish(_event(n))
+
+        entries = bus.events_since(0)
+        assert [seq for seq, _ in entries] == [7, 8, 9, 10]
+
+    @pytest.mark.asyncio
+    async def test_missed_since_counts_evicted_events(self):
+        bus = EventBus(ring_size=4)
+        for n in range(10):
+            await bus.publish(_event(n))
+
+        assert bus.missed_since(0) == 6
+        assert bus.missed_since(6) == 0
+        assert bus.missed_since(bus.last_seq) == 0
+
+    @pytest.mark.asyncio
+    async def test_wait_events_wakes_on_publish(self):
+        bus = EventBus()
+        waiter = asyncio.create_task(bus.wait_events(bus.last_seq, timeout=5))
+        await asyncio.sleep(0)
+        await bus.publish(_event(1))
+
+        entries = await waiter
+        assert [e.data["n"] for _, e in entries] == [1]
+
+    @pytest.mark.asyncio
+    async def test_publish_sync_wakes_registered_reader(self):
+        bus = EventBus()
+        waiter = bus.open_stream()
+        reader = asyncio.create_task(bus.wait_events(bus.last_seq, timeout=5, waiter=waiter))
+        await asyncio.sleep(0)
+        bus.publish_sync(_event(2))
+
+        entries = await reader
+        bus.close_stream(waiter)
+        assert [e.data["n"] for _, e in entries] == [2]
+
+    @pytest.mark.asyncio
+    async def test_publish_awaits_coroutine_subscribers(self):
+        bus = EventBus()
+        seen = []
+
+        async def callback(event):
+            await asyncio.sleep(0)
+            seen.append(event.data["n"])
+
+        bus.subscribe(callback)
+        await bus.publish(_event(1))
+        assert seen == [1]
+
+    @pytest.mark.asyncio
+    async def test_publish_many_keeps_order(self):
+        bus = EventBus()
+        seen = []
+        bus.subscribe(lambda e: seen.append(e.data["n"]))
+        waiter = asyncio.create_task(bus.wait_events(bus.last_seq, timeout=5))
+        await asyncio.sleep(0)
+        await bus.publish_many([_event(n) for n in range(3)])
+
+        assert [e.data["n"] for _, e in await waiter] == [0, 1, 2]
+        assert seen == [0, 1, 2]
+        assert [e.data["n"] for e in bus.get_history()] == [0, 1, 2]
+
+    @pytest.mark.asyncio
+    async def test_wait_events_timeout(self):
+        bus = EventBus()
+        assert await bus.wait_events(bus.last_seq, timeout=0.01) == []
+
+
+class TestEventEncoding:
+    """Tests for the cached wire encodings."""
+
+    def test_encoded_once_and_framed_for_sse(self):
+        event = _event(7)
+        payload = event.to_bytes()
+        assert payload is event.to_bytes()
+        assert event.to_sse() == b"data: " + payload + b"\n\n"
+        assert json.loads(payload)["data"] == {"n": 7}
+
+    @pytest.mark.asyncio
+    async def test_timestamp_shared_within_loop_iteration(self):
+        first, second = _event(1), _event(2)
+        assert first.timestamp is second.timestamp
+        assert first.to_dict()["timestamp"] == first.timestamp.isoformat() + "Z"
+
+        await asyncio.sleep(0)
+        assert _event(3).timestamp is not first.timestamp
+
+    def test_large_tool_output_is_truncated(self):
+        small = create_tool_call_result_event("a", "t1", "parse_ast", True, {"valid": True}, 1)
+        assert small.data["output"] == {"valid": True}
+        assert "output_truncated" not in small.data
+
+        big = {"matches": ["x" * 100] * 500}
+        event = create_tool_call_result_event("a", "t2", "search_pattern", True, big, 1)
+        assert event.data["output_truncated"]
+        assert event.data["output"].startswith('{"matches":["xxx')
+        assert len(event.data["output"]) < TOOL_OUTPUT_PREVIEW_CHARS + 64
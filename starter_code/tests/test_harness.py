@@ -8,22 +8,66 @@ This module provides tools to:
 - Generate evaluation reports
 
 Run with: python -m tests.test_harness
-         or: pytest tests/test_harness.py -v
+         or: pytest tests/test_harness_tests.py -v
 """
 
 import json
 import asyncio
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any, Tuple, Optional
+from typing import Dict, FrozenSet, List, Any, Tuple, Optional
 from dataclasses import dataclass, field
 from datetime import datetime
 import re
 
+import orjson
+
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 
-@dataclass
+# Map similar categories
+CATEGORY_ALIASES = {
+    "sql_injection": ["injection", "sqli", "sql"],
+    "xss": ["cross-site scripting", "cross_site_scripting", "xss"],
+    "command_injection": ["os_command", "cmd_injection", "shell_injection"],
+    "deserialization": ["insecure_deserialization", "pickle", "unsafe_deserialization"],
+    "null_reference": ["null_pointer", "none_reference", "attributeerror", "null_deref"],
+    "hardcoded_secrets": ["hardcoded_credentials", "secrets", "credentials"],
+    "race_condition": ["race", "concurrency", "toctou"],
+    "cryptographic": ["crypto", "weak_hash", "md5", "sha1"],
+}
+
+# alias (or canonical name) -> canonical name; built in reverse so the first
+# listing wins, as it did when the table was scanned in order
+_ALIAS_TO_CANONICAL = {
+    alias: main
+    for main, aliases in reversed(CATEGORY_ALIASES.items())
+    for alias in [main] + aliases
+}
+
+
+_WORD = re.compile(r'\w+')
+
+
+def word_set(text: str) -> FrozenSet[str]:
+    """Return the set of lower-cased words in text."""
+    return frozenset(_WORD.findall(text.lower()))
+
+
+def normalize_category(cat: str) -> str:
+    """Return the canonical name for a category or one of its aliases."""
+    cat = cat.lower().replace("-", "_").replace(" ", "_")
+    return _ALIAS_TO_CANONICAL.get(cat, cat)
+
+
+# (resolved path, mtime_ns, size) -> parsed ground truth, shared read-only by
+# every harness built on the same file
+_GROUND_TRUTH_CACHE: Dict[Tuple[str, int, int], Dict[str, Any]] = {}
+
+
+@dataclass(slots=True)
 class Finding:
     """Represents a code review finding."""
     finding_id: str
@@ -35,6 +79,18 @@ class Finding:
     code_snippet: Optional[str] = None
     fix_proposed: Optional[str] = None
     agent: Optional[str] = None
+    normalized_category: str = field(init=False, repr=False, compare=False)
+    words: FrozenSet[str] = field(init=False, repr=False, compare=False)
+    word_count: int = field(init=False, repr=False, compare=False)
+    # Bitmap of words over the evaluating harness's vocabulary
+    word_bits: int = field(init=False, default=0, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # Normalized and tokenized once here instead of for every pair that
+        # gets scored
+        self.normalized_category = normalize_category(self.category)
+        self.words = word_set(self.title + " " + self.description)
+        self.word_count = len(self.words)
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Finding':
@@ -52,7 +108,7 @@ class Finding:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class EvaluationResult:
     """Result of evaluating findings against ground truth."""
     filename: str
@@ -82,7 +138,7 @@ class EvaluationResult:
         }
 
 
-@dataclass 
+@dataclass(slots=True)
 class AggregateResults:
     """Aggregated results across all files."""
     total_files: int
@@ -137,11 +193,22 @@ class TestHarness:
         """
         self.ground_truth_path = Path(ground_truth_path)
         self.ground_truth = self._load_ground_truth(ground_truth_path)
+        self._expected_cache: Dict[str, List[Finding]] = {}
+        # word -> bit position, for words of expected findings only: overlap
+        # is measured against those, so the vocabulary stays as small as the
+        # ground truth and bitmaps stay narrow however many findings are
+        # scored
+        self._word_bits: Dict[str, int] = {}
 
     def _load_ground_truth(self, path: str) -> Dict[str, Any]:
-        """Load ground truth from JSON file."""
-        with open(path, 'r') as f:
-            return json.load(f)
+        """Load ground truth from JSON file (parsed once per file version)."""
+        st = Path(path).stat()
+        key = (str(Path(path).resolve()), st.st_mtime_ns, st.st_size)
+        data = _GROUND_TRUTH_CACHE.get(key)
+        if data is None:
+            data = orjson.loads(Path(path).read_bytes())
+            _GROUND_TRUTH_CACHE[key] = data
+        return data
 
     def evaluate_file(
         self,
@@ -158,61 +225,60 @@ class TestHarness:
         Returns:
             EvaluationResult with metrics
         """
-        # Get expected findings for this file
-        file_data = self.ground_truth.get("files", {}).get(filename, {})
-        expected_findings = file_data.get("expected_findings", [])
-        
         # Convert to Finding objects
         actual = [Finding.from_dict(f) for f in findings]
-        expected = [Finding.from_dict(f) for f in expected_findings]
-        
-        # Match findings
-        matched_expected = set()
-        matched_actual = set()
+        expected = self._expected_findings(filename)
+        for act in actual:
+            act.word_bits = self._word_bitmap(act.words)
+        
+        # Score every pair, then take the assignment with the most matches,
+        # breaking ties by total confidence; greedy first-fit can steal an
+        # expected finding that a later actual finding needed. Each match is
+        # worth more than any assignment's total confidence, so trading two
+        # strong matches for three weaker ones always wins.
+        scores = [[self._match_finding(act, exp) for exp in expected] for act in actual]
+        bonus = min(len(actual), len(expected)) + 1.0
+        weights = [[bonus + conf if ok else 0.0 for ok, conf in row] for row in scores]
+        
+        matched_expected = [False] * len(expected)
+        matched_actual = [False] * len(actual)
         details = []
-        
-        for i, act in enumerate(actual):
-            for j, exp in enumerate(expected):
-                if j in matched_expected:
-                    continue
-                    
-                is_match, confidence = self._match_finding(act, exp)
-                if is_match:
-                    matched_expected.add(j)
-                    matched_actual.add(i)
-                    details.append({
-                        "status": "TP",
-                        "title": act.title,
-                        "expected_title": exp.title,
-                        "confidence": confidence,
-                        "severity": act.severity,
-                        "line": act.line
-                    })
-                    break
+        tp = 0
+        
+        for i, j in _max_weight_assignment(weights):
+            is_match, confidence = scores[i][j]
+            if not is_match:
+                continue
+            act, exp = actual[i], expected[j]
+            matched_expected[j] = matched_actual[i] = True
+            tp += 1
+            details.append({
+                "status": "TP",
+                "title": act.title,
+                "expected_title": exp.title,
+                "confidence": confidence,
+                "severity": act.severity,
+                "line": act.line
+            })
         
         # False positives (actual findings not matched)
-        for i, act in enumerate(actual):
-            if i not in matched_actual:
-                details.append({
-                    "status": "FP",
-                    "title": act.title,
-                    "severity": act.severity,
-                    "line": act.line,
-                    "reason": "No matching expected finding"
-                })
+        details.extend({
+            "status": "FP",
+            "title": act.title,
+            "severity": act.severity,
+            "line": act.line,
+            "reason": "No matching expected finding"
+        } for act, hit in zip(actual, matched_actual) if not hit)
         
         # False negatives (expected findings not matched)
-        for j, exp in enumerate(expected):
-            if j not in matched_expected:
-                details.append({
-                    "status": "FN",
-                    "title": exp.title,
-                    "severity": exp.severity,
-                    "line": exp.line,
-                    "reason": "Not detected by system"
-                })
+        details.extend({
+            "status": "FN",
+            "title": exp.title,
+            "severity": exp.severity,
+            "line": exp.line,
+            "reason": "Not detected by system"
+        } for exp, hit in zip(expected, matched_expected) if not hit)
         
-        tp = len(matched_expected)
         fp = len(actual) - tp
         fn = len(expected) - tp
         
@@ -231,6 +297,39 @@ class TestHarness:
             found_count=len(actual)
         )
 
+    def _expected_findings(self, filename: str) -> List[Finding]:
+        """Return the expected Finding objects for a file, converted once."""
+        expected = self._expected_cache.get(filename)
+        if expected is None:
+            file_data = self.ground_truth.get("files", {}).get(filename, {})
+            expected = [Finding.from_dict(f) for f in file_data.get("expected_findings", [])]
+            for exp in expected:
+                exp.word_bits = self._word_bitmap(exp.words, grow=True)
+            self._expected_cache[filename] = expected
+        return expected
+
+    def _word_bitmap(self, words: FrozenSet[str], grow: bool = False) -> int:
+        """
+        Return words as an integer bitmap over the harness vocabulary.
+
+        Args:
+            words: Words to encode
+            grow: Add unknown words to the vocabulary instead of skipping them
+
+        Returns:
+            Bitmap with bit self._word_bits[word] set for each known word
+        """
+        vocabulary = self._word_bits
+        bits = 0
+        for word in words:
+            bit = vocabulary.get(word)
+            if bit is None:
+                if not grow:
+                    continue
+                bit = vocabulary[word] = len(vocabulary)
+            bits |= 1 << bit
+        return bits
+
     def _match_finding(
         self,
         actual: Finding,
@@ -249,35 +348,14 @@ class TestHarness:
         confidence = 0.0
         
         # Category matching (most important)
-        actual_cat = actual.category.lower()
-        expected_cat = expected.category.lower()
-        
-        # Map similar categories
-        category_aliases = {
-            "sql_injection": ["injection", "sqli", "sql"],
-            "xss": ["cross-site scripting", "cross_site_scripting", "xss"],
-            "command_injection": ["os_command", "cmd_injection", "shell_injection"],
-            "deserialization": ["insecure_deserialization", "pickle", "unsafe_deserialization"],
-            "null_reference": ["null_pointer", "none_reference", "attributeerror", "null_deref"],
-            "hardcoded_secrets": ["hardcoded_credentials", "secrets", "credentials"],
-            "race_condition": ["race", "concurrency", "toctou"],
-            "cryptographic": ["crypto", "weak_hash", "md5", "sha1"],
-        }
-        
-        def normalize_category(cat: str) -> str:
-            cat = cat.lower().replace("-", "_").replace(" ", "_")
-            for main, aliases in category_aliases.items():
-                if cat == main or cat in aliases:
-                    return main
-            return cat
-        
-        norm_actual = normalize_category(actual_cat)
-        norm_expected = normalize_category(expected_cat)
+        norm_actual = actual.normalized_category
+        norm_expected = expected.normalized_category
         
         if norm_actual == norm_expected:
             confidence += 0.4
-        elif any(norm_actual in alias or norm_expected in alias 
-                 for alias in category_aliases.get(norm_actual, []) + category_aliases.get(norm_expected, [])):
+        elif any(norm_actual in alias or norm_expected in alias
+                 for key in (norm_actual, norm_expected)
+                 for alias in CATEGORY_ALIASES.get(key, ())):
             confidence += 0.3
         
         # Line number matching
@@ -290,17 +368,9 @@ class TestHarness:
             elif line_diff <= 5:
                 confidence += 0.1
         
-        # Title/description similarity
-        actual_text = (actual.title + " " + actual.description).lower()
-        expected_text = (expected.title + " " + expected.description).lower()
-        
-        # Check for keyword overlap
-        actual_words = set(re.findall(r'\w+', actual_text))
-        expected_words = set(re.findall(r'\w+', expected_text))
-        common_words = actual_words & expected_words
-        
-        if len(expected_words) > 0:
-            word_overlap = len(common_words) / len(expected_words)
+        # Title/description similarity: keyword overlap
+        if expected.word_count > 0:
+            word_overlap = (actual.word_bits & expected.word_bits).bit_count() / expected.word_count
             confidence += word_overlap * 0.3
         
         # Consider it a match if confidence > 0.5
@@ -315,27 +385,30 @@ class TestHarness:
         Args:
             result: Evaluation result to report
         """
-        print("\n" + "=" * 70)
-        print(f"EVALUATION REPORT: {result.filename}")
-        print("=" * 70)
-
-        print(f"\n📊 Metrics:")
-        print(f"   Expected findings: {result.expected_count}")
-        print(f"   Found findings:    {result.found_count}")
-        print(f"   True Positives:    {result.true_positives}")
-        print(f"   False Positives:   {result.false_positives}")
-        print(f"   False Negatives:   {result.false_negatives}")
-        print(f"\n   Precision: {result.precision:.1%}")
-        print(f"   Recall:    {result.recall:.1%}")
-        print(f"   F1 Score:  {result.f1_score:.1%}")
+        out: List[str] = []
+        out.append("\n" + "=" * 70)
+        out.append(f"EVALUATION REPORT: {result.filename}")
+        out.append("=" * 70)
+
+        out.append(f"\n📊 Metrics:")
+        out.append(f"   Expected findings: {result.expected_count}")
+        out.append(f"   Found findings:    {result.found_count}")
+        out.append(f"   True Positives:    {result.true_positives}")
+        out.append(f"   False Positives:   {result.false_positives}")
+        out.append(f"   False Negatives:   {result.false_negatives}")
+        out.append(f"\n   Precision: {result.precision:.1%}")
+        out.append(f"   Recall:    {result.recall:.1%}")
+        out.append(f"   F1 Score:  {result.f1_score:.1%}")
 
         if result.details:
-            print(f"\n📋 Details:")
+            out.append(f"\n📋 Details:")
             for detail in result.details:
                 status = detail.get("status", "?")
                 title = detail.get("title", "Unknown")[:50]
                 icon = "✅" if status == "TP" else "❌" if status == "FP" else "⚠️"
-                print(f"   {icon} [{status}] {title}")
+                out.append(f"   {icon} [{status}] {title}")
+        
+        sys.stdout.write("\n".join(out) + "\n")
 
     def print_aggregate_report(self, results: AggregateResults) -> None:
         """
@@ -344,40 +417,46 @@ class TestHarness:
         Args:
             results: Aggregated results across all files
         """
-        print("\n" + "=" * 70)
-        print("AGGREGATE EVALUATION REPORT")
-        print("=" * 70)
-        
-        print(f"\n📊 Overall Metrics:")
-        print(f"   Files analyzed:    {results.total_files}")
-        print(f"   Expected findings: {results.total_expected}")
-        print(f"   Found findings:    {results.total_found}")
-        print(f"   True Positives:    {results.total_tp}")
-        print(f"   False Positives:   {results.total_fp}")
-        print(f"   False Negatives:   {results.total_fn}")
-        print(f"\n   Precision: {results.precision:.1%}")
-        print(f"   Recall:    {results.recall:.1%}")
-        print(f"   F1 Score:  {results.f1_score:.1%}")
+        out: List[str] = []
+        out.append("\n" + "=" * 70)
+        out.append("AGGREGATE EVALUATION REPORT")
+        out.append("=" * 70)
+        
+        out.append(f"\n📊 Overall Metrics:")
+        out.append(f"   Files analyzed:    {results.total_files}")
+        out.append(f"   Expected findings: {results.total_expected}")
+        out.append(f"   Found findings:    {results.total_found}")
+        out.append(f"   True Positives:    {results.total_tp}")
+        out.append(f"   False Positives:   {results.total_fp}")
+        out.append(f"   False Negatives:   {results.total_fn}")
+        out.append(f"\n   Precision: {results.precision:.1%}")
+        out.append(f"   Recall:    {results.recall:.1%}")
+        out.append(f"   F1 Score:  {results.f1_score:.1%}")
         
         if results.severity_breakdown:
-            print(f"\n🎯 Severity Breakdown:")
+            out.append(f"\n🎯 Severity Breakdown:")
             for sev, count in sorted(results.severity_breakdown.items()):
-                print(f"   {sev.capitalize()}: {count}")
+                out.append(f"   {sev.capitalize()}: {count}")
         
-        print(f"\n📁 Per-File Results:")
+        out.append(f"\n📁 Per-File Results:")
         for filename, file_result in results.per_file_results.items():
             status = "✅" if file_result.f1_score >= 0.8 else "⚠️" if file_result.f1_score >= 0.6 else "❌"
-            print(f"   {status} {filename}: P={file_result.precision:.0%} R={file_result.recall:.0%} F1={file_result.f1_score:.0%}")
+            out.append(f"   {status} {filename}: P={file_result.precision:.0%} R={file_result.recall:.0%} F1={file_result.f1_score:.0%}")
+        
+        sys.stdout.write("\n".join(out) + "\n")
 
     def run_full_evaluation(
         self,
-        findings_by_file: Dict[str, List[Dict[str, Any]]]
+        findings_by_file: Dict[str, List[Dict[str, Any]]],
+        parallel: bool = False
     ) -> AggregateResults:
         """
         Run evaluation on multiple files.
 
         Args:
             findings_by_file: Dictionary mapping filename to list of findings
+            parallel: Evaluate files in worker processes; only worth it for
+                many files, since each worker starts its own harness
 
         Returns:
             AggregateResults with aggregated metrics
@@ -388,11 +467,17 @@ class TestHarness:
         total_fn = 0
         total_expected = 0
         total_found = 0
-        severity_breakdown = {}
-        category_breakdown = {}
         
-        for filename, findings in findings_by_file.items():
-            result = self.evaluate_file(filename, findings)
+        if parallel:
+            jobs = [(str(self.ground_truth_path), filename, findings)
+                    for filename, findings in findings_by_file.items()]
+            with ProcessPoolExecutor() as pool:
+                results = list(pool.map(_evaluate_file_job, jobs))
+        else:
+            results = [self.evaluate_file(filename, findings)
+                       for filename, findings in findings_by_file.items()]
+        
+        for filename, result in zip(findings_by_file, results):
             per_file_results[filename] = result
             
             total_tp += result.true_positives
@@ -400,14 +485,11 @@ class TestHarness:
             total_fn += result.false_negatives
             total_expected += result.expected_count
             total_found += result.found_count
-            
-            # Track severity breakdown
-            for finding in findings:
-                sev = finding.get("severity", "medium").lower()
-                severity_breakdown[sev] = severity_breakdown.get(sev, 0) + 1
-                
-                cat = finding.get("category", "unknown").lower()
-                category_breakdown[cat] = category_breakdown.get(cat, 0) + 1
+        
+        # Track severity and category breakdowns
+        all_findings = [f for findings in findings_by_file.values() for f in findings]
+        severity_breakdown = dict(Counter(f.get("severity", "medium").lower() for f in all_findings))
+        category_breakdown = dict(Counter(f.get("category", "unknown").lower() for f in all_findings))
         
         precision, recall, f1 = calculate_metrics(total_tp, total_fp, total_fn)
         
@@ -427,6 +509,73 @@ class TestHarness:
         )
 
 
+def _evaluate_file_job(job: Tuple[str, str, List[Dict[str, Any]]]) -> EvaluationResult:
+    """Worker entry for parallel evaluation: (ground truth path, filename, findings)."""
+    # A harness per worker process: word bitmaps are only comparable within
+    # the process that built them
+    ground_truth_path, filename, findings = job
+    return TestHarness(ground_truth_path).evaluate_file(filename, findings)
+
+
+def _max_weight_assignment(weights: List[List[float]]) -> List[Tuple[int, int]]:
+    """
+    Solve the assignment problem for a weight matrix (Kuhn-Munkres).
+
+    Args:
+        weights: weights[i][j] is the value of pairing row i with column j
+
+    Returns:
+        (row, col) pairs of a maximum-weight assignment, sorted by row;
+        min(rows, cols) pairs are returned, including zero-weight ones
+    """
+    if not weights or not weights[0]:
+        return []
+    transposed = len(weights) > len(weights[0])
+    if transposed:
+        weights = [list(col) for col in zip(*weights)]
+    
+    # Shortest augmenting path with potentials, 1-indexed; minimizes -weight
+    n, m = len(weights), len(weights[0])
+    inf = float("inf")
+    u = [0.0] * (n + 1)
+    v = [0.0] * (m + 1)
+    owner = [0] * (m + 1)
+    way = [0] * (m + 1)
+    for i in range(1, n + 1):
+        owner[0] = i
+        j0 = 0
+        minv = [inf] * (m + 1)
+        used = [False] * (m + 1)
+        while owner[j0]:
+            used[j0] = True
+            i0 = owner[j0]
+            row = weights[i0 - 1]
+            delta, j1 = inf, 0
+            for j in range(1, m + 1):
+                if not used[j]:
+                    cur = -row[j - 1] - u[i0] - v[j]
+                    if cur < minv[j]:
+                        minv[j], way[j] = cur, j0
+                    if minv[j] < delta:
+                        delta, j1 = minv[j], j
+            for j in range(m + 1):
+                if used[j]:
+                    u[owner[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+        while j0:
+            j1 = way[j0]
+            owner[j0] = owner[j1]
+            j0 = j1
+    
+    pairs = [(owner[j] - 1, j - 1) for j in range(1, m + 1) if owner[j]]
+    if transposed:
+        pairs = [(col, row) for row, col in pairs]
+    return sorted(pairs)
+
+
 def calculate_metrics(tp: int, fp: int, fn: int) -> Tuple[float, float, float]:
     """
     Calculate precision, recall, and F1 score.
@@ -441,263 +590,12 @@ def calculate_metrics(tp: int, fp: int, fn: int) -> Tuple[float, float, float]:
     """
     precision = tp / (tp + fp) if (tp + fp) > 0 else 0.0
     recall = tp / (tp + fn) if (tp + fn) > 0 else 0.0
-    f1 = 2 * precision * recall / (precision + recall) if (precision + recall) > 0 else 0.0
+    # Harmonic mean of precision and recall, taken straight from the counts
+    f1 = 2 * tp / (2 * tp + fp + fn) if tp > 0 else 0.0
 
     return precision, recall, f1
 
 
-# ============================================================================
-# Tests for the Test Harness
-# ============================================================================
-
-import pytest
-
-
-class TestCalculateMetrics:
-    """Tests for calculate_metrics function."""
-    
-    def test_perfect_scores(self):
-        """Test with all correct predictions."""
-        p, r, f1 = calculate_metrics(tp=10, fp=0, fn=0)
-        assert p == 1.0
-        assert r == 1.0
-        assert f1 == 1.0
-    
-    def test_no_predictions(self):
-        """Test with no predictions."""
-        p, r, f1 = calculate_metrics(tp=0, fp=0, fn=10)
-        assert p == 0.0
-        assert r == 0.0
-        assert f1 == 0.0
-    
-    def test_half_precision(self):
-        """Test 50% precision."""
-        p, r, f1 = calculate_metrics(tp=5, fp=5, fn=0)
-        assert p == 0.5
-        assert r == 1.0
-    
-    def test_half_recall(self):
-        """Test 50% recall."""
-        p, r, f1 = calculate_metrics(tp=5, fp=0, fn=5)
-        assert p == 1.0
-        assert r == 0.5
-
-
-class TestFinding:
-    """Tests for Finding dataclass."""
-    
-    def test_from_dict(self):
-        """Test creating Finding from dictionary."""
-        data = {
-            "finding_id": "f1",
-            "category": "sql_injection",
-            "severity": "critical",
-            "title": "SQL Injection",
-            "description": "User input in query",
-            "line": 42
-        }
-        finding = Finding.from_dict(data)
-        
-        assert finding.finding_id == "f1"
-        assert finding.category == "sql_injection"
-        assert finding.severity == "critical"
-        assert finding.line == 42
-    
-    def test_from_dict_with_location(self):
-        """Test creating Finding with nested location."""
-        data = {
-            "id": "f2",
-            "type": "xss",
-            "severity": "high",
-            "title": "XSS",
-            "description": "...",
-            "location": {"line": 100, "file": "test.py"}
-        }
-        finding = Finding.from_dict(data)
-        
-        assert finding.finding_id == "f2"
-        assert finding.category == "xss"
-        assert finding.line == 100
-
-
-class TestTestHarness:
-    """Tests for TestHarness class."""
-    
-    @pytest.fixture
-    def sample_ground_truth(self, tmp_path):
-        """Create sample ground truth file."""
-        ground_truth = {
-            "files": {
-                "test.py": {
-                    "expected_findings": [
-                        {
-                            "id": "e1",
-                            "category": "sql_injection",
-                            "severity": "critical",
-                            "title": "SQL Injection in authenticate",
-                            "description": "User input concatenated into query",
-                            "line": 10
-                        },
-                        {
-                            "id": "e2",
-                            "category": "null_reference",
-                            "severity": "medium",
-                            "title": "Potential None access",
-                            "description": "user.name accessed without check",
-                            "line": 25
-                        }
-                    ]
-                }
-            }
-        }
-        
-        path = tmp_path / "expected.json"
-        path.write_text(json.dumps(ground_truth))
-        return str(path)
-    
-    def test_perfect_match(self, sample_ground_truth):
-        """Test evaluation with perfect matches."""
-        harness = TestHarness(sample_ground_truth)
-        
-        findings = [
-            {
-                "finding_id": "a1",
-                "category": "sql_injection",
-                "severity": "critical",
-                "title": "SQL Injection vulnerability",
-                "description": "Query uses string concatenation",
-                "line": 10
-            },
-            {
-                "finding_id": "a2",
-                "category": "null_reference",
-                "severity": "medium",
-                "title": "NoneType error possible",
-                "description": "Accessing .name on potentially None",
-                "line": 25
-            }
-        ]
-        
-        result = harness.evaluate_file("test.py", findings)
-        
-        assert result.true_positives == 2
-        assert result.false_positives == 0
-        assert result.false_negatives == 0
-        assert result.precision == 1.0
-        assert result.recall == 1.0
-    
-    def test_partial_match(self, sample_ground_truth):
-        """Test evaluation with partial matches."""
-        harness = TestHarness(sample_ground_truth)
-        
-        findings = [
-            {
-                "finding_id": "a1",
-                "category": "sql_injection",
-                "severity": "critical",
-                "title": "SQL Injection",
-                "description": "...",
-                "line": 10
-            }
-        ]
-        
-        result = harness.evaluate_file("test.py", findings)
-        
-        assert result.true_positives == 1
-        assert result.false_positives == 0
-        assert result.false_negatives == 1
-        assert result.recall == 0.5
-    
-    def test_false_positives(self, sample_ground_truth):
-        """Test evaluation with false positives."""
-        harness = TestHarness(sample_ground_truth)
-        
-        findings = [
-            {
-                "finding_id": "a1",
-                "category": "sql_injection",
-                "severity": "critical",
-                "title": "SQL Injection",
-                "description": "...",
-                "line": 10
-            },
-            {
-                "finding_id": "a2",
-                "category": "null_reference",
-                "severity": "medium",
-                "title": "None check",
-                "description": "...",
-                "line": 25
-            },
-            {
-                "finding_id": "a3",
-                "category": "xss",
-                "severity": "high",
-                "title": "False positive XSS",
-                "description": "This doesn't exist in ground truth",
-                "line": 50
-            }
-        ]
-        
-        result = harness.evaluate_file("test.py", findings)
-        
-        assert result.true_positives == 2
-        assert result.false_positives == 1
-        assert result.precision < 1.0
-
-
-class TestAggregateResults:
-    """Tests for aggregate evaluation."""
-    
-    @pytest.fixture
-    def multi_file_ground_truth(self, tmp_path):
-        """Create ground truth with multiple files."""
-        ground_truth = {
-            "files": {
-                "file1.py": {
-                    "expected_findings": [
-                        {"id": "1", "category": "sql_injection", "severity": "critical", 
-                         "title": "SQLi", "description": "...", "line": 10}
-                    ]
-                },
-                "file2.py": {
-                    "expected_findings": [
-                        {"id": "2", "category": "xss", "severity": "high",
-                         "title": "XSS", "description": "...", "line": 20}
-                    ]
-                }
-            }
-        }
-        
-        path = tmp_path / "expected.json"
-        path.write_text(json.dumps(ground_truth))
-        return str(path)
-    
-    def test_aggregate_evaluation(self, multi_file_ground_truth):
-        """Test aggregated evaluation across multiple files."""
-        harness = TestHarness(multi_file_ground_truth)
-        
-        findings_by_file = {
-            "file1.py": [
-                {"finding_id": "f1", "category": "sql_injection", "severity": "critical",
-                 "title": "SQL Injection", "description": "...", "line": 10}
-            ],
-            "file2.py": [
-                {"finding_id": "f2", "category": "xss", "severity": "high",
-                 "title": "XSS vulnerability", "description": "...", "line": 20}
-            ]
-        }
-        
-        results = harness.run_full_evaluation(findings_by_file)
-        
-        assert results.total_files == 2
-        assert results.total_tp == 2
-        assert results.total_fp == 0
-        assert results.total_fn == 0
-        assert results.precision == 1.0
-        assert results.recall == 1.0
-
-
 # ============================================================================
 # CLI Entry Point
 # ============================================================================
@@ -725,7 +623,8 @@ def main():
     args = parser.parse_args()
     
     if args.run_tests:
-        pytest.main([__file__, "-v"])
+        import pytest
+        pytest.main([str(Path(__file__).with_name("test_harness_tests.py")), "-v"])
         return
     
     if args.findings:
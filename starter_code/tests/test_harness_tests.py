@@ -0,0 +1,322 @@
+"""
+Tests for the evaluation harness.
+
+Run with: pytest tests/test_harness_tests.py -v
+"""
+
+import pytest
+import json
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tests.test_harness import Finding, TestHarness, calculate_metrics
+
+
+class TestCalculateMetrics:
+    """Tests for calculate_metrics function."""
+    
+    def test_perfect_scores(self):
+        """Test with all correct predictions."""
+        p, r, f1 = calculate_metrics(tp=10, fp=0, fn=0)
+        assert p == 1.0
+        assert r == 1.0
+        assert f1 == 1.0
+    
+    def test_no_predictions(self):
+        """Test with no predictions."""
+        p, r, f1 = calculate_metrics(tp=0, fp=0, fn=10)
+        assert p == 0.0
+        assert r == 0.0
+        assert f1 == 0.0
+    
+    def test_half_precision(self):
+        """Test 50% precision."""
+        p, r, f1 = calculate_metrics(tp=5, fp=5, fn=0)
+        assert p == 0.5
+        assert r == 1.0
+    
+    def test_half_recall(self):
+        """Test 50% recall."""
+        p, r, f1 = calculate_metrics(tp=5, fp=0, fn=5)
+        assert p == 1.0
+        assert r == 0.5
+
+
+class TestFinding:
+    """Tests for Finding dataclass."""
+    
+    def test_from_dict(self):
+        """Test creating Finding from dictionary."""
+        data = {
+            "finding_id": "f1",
+            "category": "sql_injection",
+            "severity": "critical",
+            "title": "SQL Injection",
+            "description": "User input in query",
+            "line": 42
+        }
+        finding = Finding.from_dict(data)
+        
+        assert finding.finding_id == "f1"
+        assert finding.category == "sql_injection"
+        assert finding.severity == "critical"
+        assert finding.line == 42
+    
+    def test_from_dict_with_location(self):
+        """Test creating Finding with nested location."""
+        data = {
+            "id": "f2",
+            "type": "xss",
+            "severity": "high",
+            "title": "XSS",
+            "description": "...",
+            "location": {"line": 100, "file": "test.py"}
+        }
+        finding = Finding.from_dict(data)
+        
+        assert finding.finding_id == "f2"
+        assert finding.category == "xss"
+        assert finding.line == 100
+
+
+class TestTestHarness:
+    """Tests for TestHarness class."""
+    
+    @pytest.fixture
+    def sample_ground_truth(self, tmp_path):
+        """Create sample ground truth file."""
+        ground_truth = {
+            "files": {
+                "test.py": {
+                    "expected_findings": [
+                        {
+                            "id": "e1",
+                            "category": "sql_injection",
+                            "severity": "critical",
+                            "title": "SQL Injection in authenticate",
+                            "description": "User input concatenated into query",
+                            "line": 10
+                        },
+                        {
+                            "id": "e2",
+                            "category": "null_reference",
+                            "severity": "medium",
+                            "title": "Potential None access",
+                            "description": "user.name accessed without check",
+                            "line": 25
+                        }
+                    ]
+                }
+            }
+        }
+        
+        path = tmp_path / "expected.json"
+        path.write_text(json.dumps(ground_truth))
+        return str(path)
+    
+    def test_perfect_match(self, sample_ground_truth):
+        """Test evaluation with perfect matches."""
+        harness = TestHarness(sample_ground_truth)
+        
+        findings = [
+            {
+                "finding_id": "a1",
+                "category": "sql_injection",
+                "severity": "critical",
+                "title": "SQL Injection vulnerability",
+                "description": "Query uses string concatenation",
+                "line": 10
+            },
+            {
+                "finding_id": "a2",
+                "category": "null_reference",
+                "severity": "medium",
+                "title": "NoneType error possible",
+                "description": "Accessing .name on potentially None",
+                "line": 25
+            }
+        ]
+        
+        result = harness.evaluate_file("test.py", findings)
+        
+        assert result.true_positives == 2
+        assert result.false_positives == 0
+        assert result.false_negatives == 0
+        assert result.precision == 1.0
+        assert result.recall == 1.0
+    
+    def test_partial_match(self, sample_ground_truth):
+        """Test evaluation with partial matches."""
+        harness = TestHarness(sample_ground_truth)
+        
+        findings = [
+            {
+                "finding_id": "a1",
+                "category": "sql_injection",
+                "severity": "critical",
+                "title": "SQL Injection",
+                "description": "...",
+                "line": 10
+            }
+        ]
+        
+        result = harness.evaluate_file("test.py", findings)
+        
+        assert result.true_positives == 1
+        assert result.false_positives == 0
+        assert result.false_negatives == 1
+        assert result.recall == 0.5
+    
+    def test_false_positives(self, sample_ground_truth):
+        """Test evaluation with false positives."""
+        harness = TestHarness(sample_ground_truth)
+        
+        findings = [
+            {
+                "finding_id": "a1",
+                "category": "sql_injection",
+                "severity": "critical",
+                "title": "SQL Injection",
+                "description": "...",
+                "line": 10
+            },
+            {
+                "finding_id": "a2",
+                "category": "null_reference",
+                "severity": "medium",
+                "title": "None check",
+                "description": "...",
+                "line": 25
+            },
+            {
+                "finding_id": "a3",
+                "category": "xss",
+                "severity": "high",
+                "title": "False positive XSS",
+                "description": "This doesn't exist in ground truth",
+                "line": 50
+            }
+        ]
+        
+        result = harness.evaluate_file("test.py", findings)
+        
+        assert result.true_positives == 2
+        assert result.false_positives == 1
+        assert result.precision < 1.0
+
+    def test_matching_is_not_first_fit(self, tmp_path):
+        """Matching maximizes true positives rather than first-fit or confidence."""
+        ground_truth = {"files": {"t.py": {"expected_findings": [
+            {"id": "e1", "category": "sql_injection", "title": "SQL Injection in login", "line": 10},
+            {"id": "e2", "category": "sql_injection", "title": "SQL Injection in search", "line": 20},
+        ]}}}
+        path = tmp_path / "expected.json"
+        path.write_text(json.dumps(ground_truth))
+        harness = TestHarness(str(path))
+        
+        findings = [
+            {"finding_id": "a1", "category": "sql_injection",
+             "title": "SQL Injection in login and search", "line": 12},
+            {"finding_id": "a2", "category": "sql_injection", "title": "Injection", "line": 10},
+        ]
+        
+        result = harness.evaluate_file("t.py", findings)
+        
+        assert result.true_positives == 2
+        assert result.false_negatives == 0
+        
+        # Two 1.0 pairs outscore three pairs of 0.55-0.65, but three matches
+        # must win
+        ground_truth = {"files": {"t.py": {"expected_findings": [
+            {"id": "e1", "category": "sql_injection", "title": "alpha bravo", "line": 10},
+            {"id": "e2", "category": "sql_injection", "title": "delta echo", "line": 50},
+            {"id": "e3", "category": "sql_injection", "title": "golf hotel", "line": 90},
+        ]}}}
+        path.write_text(json.dumps(ground_truth))
+        harness = TestHarness(str(path))
+        
+        findings = [
+            {"finding_id": "a1", "category": "sql_injection", "title": "golf hotel alpha", "line": 90},
+            {"finding_id": "a2", "category": "sql_injection", "title": "alpha bravo delta", "line": 10},
+            {"finding_id": "a3", "category": "sql_injection", "title": "golf", "line": 86},
+        ]
+        
+        result = harness.evaluate_file("t.py", findings)
+        
+        assert result.true_positives == 3
+        assert result.false_positives == 0
+
+
+class TestAggregateResults:
+    """Tests for aggregate evaluation."""
+    
+    @pytest.fixture
+    def multi_file_ground_truth(self, tmp_path):
+        """Create ground truth with multiple files."""
+        ground_truth = {
+            "files": {
+                "file1.py": {
+                    "expected_findings": [
+                        {"id": "1", "category": "sql_injection", "severity": "critical", 
+                         "title": "SQLi", "description": "...", "line": 10}
+                    ]
+                },
+                "file2.py": {
+                    "expected_findings": [
+                        {"id": "2", "category": "xss", "severity": "high",
+                         "title": "XSS", "description": "...", "line": 20}
+                    ]
+                }
+            }
+        }
+        
+        path = tmp_path / "expected.json"
+        path.write_text(json.dumps(ground_truth))
+        return str(path)
+    
+    def test_aggregate_evaluation(self, multi_file_ground_truth):
+        """Test aggregated evaluation across multiple files."""
+        harness = TestHarness(multi_file_ground_truth)
+        
+        findings_by_file = {
+            "file1.py": [
+                {"finding_id": "f1", "category": "sql_injection", "severity": "critical",
+                 "title": "SQL Injection", "description": "...", "line": 10}
+            ],
+            "file2.py": [
+                {"finding_id": "f2", "category": "xss", "severity": "high",
+                 "title": "XSS vulnerability", "description": "...", "line": 20}
+            ]
+        }
+        
+        results = harness.run_full_evaluation(findings_by_file)
+        
+        assert results.total_files == 2
+        assert results.total_tp == 2
+        assert results.total_fp == 0
+        assert results.total_fn == 0
+        assert results.precision == 1.0
+        assert results.recall == 1.0
+    
+    def test_parallel_evaluation_matches_serial(self, multi_file_ground_truth):
+        """Worker processes produce the same totals as the serial loop."""
+        harness = TestHarness(multi_file_ground_truth)
+        
+        findings_by_file = {
+            "file1.py": [
+                {"finding_id": "f1", "category": "sql_injection", "severity": "critical",
+                 "title": "SQL Injection", "description": "...", "line": 10}
+            ],
+            "file2.py": [
+                {"finding_id": "f2", "category": "race", "severity": "high",
+                 "title": "Race", "description": "...", "line": 90}
+            ]
+        }
+        
+        serial = harness.run_full_evaluation(findings_by_file)
+        parallel = harness.run_full_evaluation(findings_by_file, parallel=True)
+        
+        assert parallel.to_dict() == serial.to_dict()
+        assert (parallel.total_tp, parallel.total_fp, parallel.total_fn) == (1, 1, 1)
@@ -0,0 +1,297 @@
+"""
+Tests for the streaming server.
+
+Run with: pytest tests/test_streaming_server.py -v
+"""
+
+import pytest
+import asyncio
+
+import httpx
+import orjson
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.testclient import TestClient
+
+from src.events import Event, EventBus, EventType
+from src.ui import streaming_server
+from src.ui.streaming_server import create_app, run_review
+
+
+class TestEndpoints:
+    """Tests for the HTTP and WebSocket endpoints."""
+
+    def test_index_supports_conditional_get(self):
+        client = TestClient(create_app(EventBus()))
+        first = client.get("/")
+        assert first.status_code == 200
+        assert "Multi-Agent Code Review" in first.text
+
+        again = client.get("/", headers={"If-None-Match": first.headers["etag"]})
+        assert again.status_code == 304
+
+    def test_websocket_ping(self):
+        client = TestClient(create_app(EventBus()))
+        with client.websocket_connect("/ws/review") as ws:
+            ws.send_text("not json")
+            ws.send_json({"type": "ping"})
+            assert orjson.loads(ws.receive_bytes()) == {"type": "pong"}
+            ws.send_bytes(b'{"type":"ping"}')
+            assert orjson.loads(ws.receive_bytes()) == {"type": "pong"}
+            ws.send_text('{"type": "ping", "id": 1}')
+            assert orjson.loads(ws.receive_bytes()) == {"type": "pong"}
+
+    def test_review_form_post(self, monkeypatch):
+        async def fake_execute(code, filename, event_bus, slots=None):
+            return {"status": "completed"}
+
+        monkeypatch.setattr(streaming_server, "_execute_review", fake_execute)
+        client = TestClient(create_app(EventBus()))
+        response = client.post("/api/review", data={"code": "x = 1", "filename": "a.py"})
+        assert response.status_code == 200
+        assert response.json()["status"] == "started"
+
+        assert client.post("/api/review", data={"filename": "a.py"}).status_code == 422
+        too_large = "x" * (streaming_server.MAX_FORM_BODY + 1)
+        assert client.post("/api/review", data={"code": too_large}).status_code == 413
+
+    def test_resubmitted_review_shares_its_id(self, monkeypatch):
+        async def fake_execute(code, filename, event_bus, slots=None):
+            await asyncio.sleep(30)
+
+        monkeypatch.setattr(streaming_server, "_execute_review", fake_execute)
+        with TestClient(create_app(EventBus())) as client:
+            first = client.post("/api/review", data={"code": "x = 1"}).json()["review_id"]
+            again = client.post("/api/review", data={"code": "x = 1"}).json()["review_id"]
+            other = client.post("/api/review", data={"code": "x = 2"}).json()["review_id"]
+        assert first == again != other
+
+    def test_reviews_queue_up_to_pending_limit(self, monkeypatch):
+        async def fake_execute(code, filename, event_bus, slots=None):
+            async with slots:
+                await asyncio.sleep(30)
+
+        monkeypatch.setattr(streaming_server, "_execute_review", fake_execute)
+        monkeypatch.setattr(streaming_server.config, "max_concurrent_reviews", 1)
+        monkeypatch.setattr(streaming_server.config, "max_pending_reviews", 2)
+        with TestClient(create_app(EventBus())) as client:
+            statuses = [client.post("/api/review", data={"code": f"x = {n}"}).status_code for n in range(3)]
+        assert statuses == [200, 200, 503]
+
+    def test_websocket_forwards_events_as_batches(self, monkeypatch):
+        async def fake_execute(code, filename, event_bus, slots=None):
+            for n in range(3):
+                await event_bus.publish(Event(EventType.THINKING, "bug_agent", {"chunk": str(n)}))
+            return {"status": "completed"}
+
+        monkeypatch.setattr(streaming_server, "_execute_review", fake_execute)
+        client = TestClient(create_app(EventBus()))
+        with client.websocket_connect("/ws/review") as ws:
+            ws.send_json({"type": "start_review", "code": "x = 1"})
+            assert orjson.loads(ws.receive_bytes())["type"] == "review_accepted"
+            batch = orjson.loads(ws.receive_bytes())
+            assert [e["data"]["chunk"] for e in batch] == ["0", "1", "2"]
+
+    def test_review_cancelled_when_its_socket_leaves_no_watchers(self, monkeypatch):
+        cancelled = []
+
+        async def fake_execute(code, filename, event_bus, slots=None):
+            try:
+                await asyncio.sleep(30)
+            except asyncio.CancelledError:
+                cancelled.append(code)
+                raise
+
+        monkeypatch.setattr(streaming_server, "_execute_review", fake_execute)
+        client = TestClient(create_app(EventBus()))
+        with client.websocket_connect("/ws/review") as ws:
+            ws.send_json({"type": "start_review", "code": "x = 1"})
+            assert orjson.loads(ws.receive_bytes())["type"] == "review_accepted"
+        assert cancelled == ["x = 1"]
+
+
+class TestRunReview:
+    """Tests for review scheduling."""
+
+    @pytest.mark.asyncio
+    async def test_identical_inflight_reviews_are_coalesced(self, monkeypatch):
+        calls = []
+
+        async def fake_execute(code, filename, event_bus, slots=None):
+            calls.append(code)
+            await asyncio.sleep(0.01)
+            return {"status": "completed", "code": code}
+
+        monkeypatch.setattr(streaming_server, "_execute_review", fake_execute)
+        bus = EventBus()
+        results = await asyncio.gather(
+            run_review("x = 1", "a.py", bus),
+            run_review("x = 1", "a.py", bus),
+            run_review("x = 2", "a.py", bus),
+        )
+
+        assert sorted(calls) == ["x = 1", "x = 2"]
+        assert results[0] == results[1] == {"status": "completed", "code": "x = 1"}
+
+    @pytest.mark.asyncio
+    async def test_slots_limit_running_reviews(self, monkeypatch):
+        running, peak = 0, 0
+
+        class FakeWorkflow:
+            async def review_code(self, code, filename):
+                nonlocal running, peak
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+                return {"status": "completed"}
+
+        monkeypatch.setattr(streaming_server.config, "validate", lambda: None)
+        monkeypatch.setattr(streaming_server, "_workflow_for", lambda bus: FakeWorkflow())
+        bus, slots = EventBus(), asyncio.Semaphore(1)
+        await asyncio.gather(*(run_review(f"x = {n}", "a.py", bus, slots) for n in range(3)))
+        assert peak == 1
+
+    @pytest.mark.asyncio
+    async def test_socket_leaving_does_not_cancel_a_review_it_joined(self, monkeypatch):
+        cancelled = []
+
+        async def fake_execute(code, filename, event_bus, slots=None):
+            try:
+                await asyncio.sleep(30)
+            except asyncio.CancelledError:
+                cancelled.append(code)
+                raise
+
+        monkeypatch.setattr(streaming_server, "_execute_review", fake_execute)
+        bus = EventBus()
+        app = create_app(bus)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/api/review", data={"code": "x = 1"})
+        review_id = response.json()["review_id"]
+
+        # Drive the socket over raw ASGI so its cleanup runs to completion
+        inbox = asyncio.Queue()
+        for message in (
+            {"type": "websocket.connect"},
+            {"type": "websocket.receive", "text": '{"type": "start_review", "code": "x = 1"}'},
+        ):
+            inbox.put_nowait(message)
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+            if message["type"] == "websocket.send":
+                inbox.put_nowait({"type": "websocket.disconnect", "code": 1000})
+
+        scope = {"type": "websocket", "path": "/ws/review", "headers": [], "query_string": b""}
+        await asyncio.wait_for(app(scope, inbox.get, send), 5)
+
+        accepted = orjson.loads(sent[1]["bytes"])
+        assert accepted == {"type": "review_accepted", "review_id": review_id}
+        assert bus.stream_count == 0
+        assert cancelled == []
+        key = (bus, streaming_server._review_digest("x = 1", "code.py"))
+        task = streaming_server._inflight_reviews[key][1]
+        assert not task.done()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+class TestBatching:
+    """Tests for stream batching."""
+
+    @pytest.mark.asyncio
+    async def test_milestone_events_skip_batch_window(self, monkeypatch):
+        monkeypatch.setattr(streaming_server, "STREAM_BATCH_WINDOW_S", 30)
+        bus = EventBus()
+        await bus.publish(Event(EventType.AGENT_COMPLETED, "bug_agent", {}))
+        entries = bus.events_since(0)
+        assert await asyncio.wait_for(streaming_server._gather_burst(bus, 0, entries), 1) == entries
+
+        await bus.publish(Event(EventType.THINKING, "bug_agent", {"chunk": "x"}))
+        burst = streaming_server._gather_burst(bus, 1, bus.events_since(1))
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(burst, 0.05)
+
+    @pytest.mark.asyncio
+    async def test_websocket_reports_dropped_events(self):
+        class FakeSocket:
+            def __init__(self):
+                self.sent = []
+
+            async def send_bytes(self, data):
+                self.sent.append(orjson.loads(data))
+
+        bus = EventBus(ring_size=2)
+        socket = FakeSocket()
+        forwarder = asyncio.create_task(streaming_server._forward_events(socket, bus))
+        await asyncio.sleep(0)
+        for n in range(5):
+            bus.publish_sync(Event(EventType.AGENT_COMPLETED, "bug_agent", {"n": n}))
+        await asyncio.sleep(0.01)
+        forwarder.cancel()
+
+        batch = socket.sent[0]
+        assert batch[0] == {"type": "dropped", "count": 3}
+        assert [e["data"]["n"] for e in batch[1:]] == [3, 4]
+
+    @pytest.mark.asyncio
+    async def test_stalled_websocket_is_closed(self, monkeypatch):
+        class StalledSocket:
+            close_code = None
+
+            async def send_bytes(self, data):
+                await asyncio.sleep(30)
+
+            async def close(self, code=1000):
+                self.close_code = code
+
+        monkeypatch.setattr(streaming_server, "STREAM_SEND_TIMEOUT_S", 0.01)
+        bus = EventBus()
+        socket = StalledSocket()
+        forwarder = asyncio.create_task(streaming_server._forward_events(socket, bus))
+        await asyncio.sleep(0)
+        await bus.publish(Event(EventType.AGENT_COMPLETED, "bug_agent", {}))
+        await asyncio.wait_for(forwarder, 1)
+
+        assert socket.close_code == 1013
+        assert bus.stream_count == 0
+
+
+class TestCORS:
+    """Tests for the precomputed CORS middleware."""
+
+    def test_preflight_answered_directly(self):
+        client = TestClient(create_app(EventBus()))
+        response = client.options("/api/review", headers={
+            "Origin": "http://example.com",
+            "Access-Control-Request-Method": "POST",
+        })
+        assert response.status_code == 200
+        assert response.headers["access-control-allow-origin"] == "*"
+        assert "POST" in response.headers["access-control-allow-methods"]
+
+    def test_simple_response_gets_allow_origin(self):
+        client = TestClient(create_app(EventBus()))
+        response = client.get("/api/health", headers={"Origin": "http://example.com"})
+        assert response.headers["access-control-allow-origin"] == "*"
+
+    def test_listed_origin_is_echoed(self, monkeypatch):
+        monkeypatch.setattr(streaming_server.config, "allowed_origins", ["http://ok.example"])
+        client = TestClient(create_app(EventBus()))
+        allowed = client.get("/api/health", headers={"Origin": "http://ok.example"})
+        assert allowed.headers["access-control-allow-origin"] == "http://ok.example"
+        assert allowed.headers["vary"] == "Origin"
+
+        other = client.get("/api/health", headers={"Origin": "http://evil.example"})
+        assert "access-control-allow-origin" not in other.headers
+        preflight = client.options("/api/review", headers={
+            "Origin": "http://evil.example",
+            "Access-Control-Request-Method": "POST",
+        })
+        assert preflight.status_code == 400